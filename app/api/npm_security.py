@@ -1,107 +1,321 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import Dict, Any, List
-import requests
-import json
-import subprocess
+from fastapi.responses import Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, Any, Union, AsyncIterator, Awaitable, List, Optional, Tuple
+import orjson
+import asyncio
+import hashlib
 import os
+import re
+import shutil
 import tempfile
+import aiofiles
+import aiohttp
+import ijson
+import weakref
+from collections import Counter
+from contextlib import asynccontextmanager
+from cachetools import TTLCache
+from urllib.parse import quote
 
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.database import get_async_db
+from app.core.http import get_http_session
 from app.api.auth import get_current_user
 from app.models.models import User
 from app.schemas.schemas import ScanResponse, ScanCreate, NPMAuditRequest, DependencyCheckRequest, LicenseScanRequest, OutdatedPackagesRequest
 
 router = APIRouter()
 
-@router.post("/npm-audit")
+NPM_REGISTRY_URL = "https://registry.npmjs.org"
+
+# Upper bound on concurrent registry lookups issued by a single request
+NPM_VIEW_CONCURRENCY = 5
+
+# Scratch npm projects live in shared memory when available so they never touch disk
+NPM_WORKDIR_ROOT = "/dev/shm" if os.path.isdir("/dev/shm") else None
+
+# npm CLI runs share one persistent cache and reuse cached metadata before hitting the network
+NPM_ENV = {
+    **os.environ,
+    "NPM_CONFIG_CACHE": settings.NPM_CACHE_PATH,
+    "npm_config_prefer_offline": "true",
+    "npm_config_audit": "false",
+    "npm_config_fund": "false",
+    "npm_config_progress": "false",
+}
+
+# npm audit runs currently executing, keyed by package.json digest
+_AUDITS_IN_FLIGHT: Dict[str, "asyncio.Task[Dict[str, Any]]"] = {}
+
+# Copyleft licenses flagged by the license scan
+_HIGH_RISK_LICENSES = frozenset({"GPL-2.0", "GPL-3.0", "AGPL-3.0"})
+_MEDIUM_RISK_LICENSES = frozenset({"LGPL-2.1", "LGPL-3.0"})
+
+# npm package names (optionally scoped); case-insensitive so legacy mixed-case packages still resolve
+_NAME_RE = re.compile(r"^(?:@[a-z0-9][\w.-]*/)?[a-z0-9][\w.-]*$", re.IGNORECASE)
+_NAME_MAX_LENGTH = 214
+
+# Packuments served from memory for a few minutes, within a budget on their raw
+# size; validators for expired entries (ETag plus raw body) are kept longer so
+# refreshes can be answered with a 304
+PACKUMENT_CACHE_TTL = 300
+PACKUMENT_CACHE_MAX_BYTES = 32 * 1024 * 1024
+PACKUMENT_VALIDATOR_TTL = 3600
+PACKUMENT_VALIDATOR_MAX_BYTES = 64 * 1024 * 1024
+_PACKUMENT_CACHE = TTLCache(
+    maxsize=PACKUMENT_CACHE_MAX_BYTES,
+    ttl=PACKUMENT_CACHE_TTL,
+    getsizeof=lambda entry: len(entry[0])
+)
+_PACKUMENT_ETAGS = TTLCache(
+    maxsize=PACKUMENT_VALIDATOR_MAX_BYTES,
+    ttl=PACKUMENT_VALIDATOR_TTL,
+    getsizeof=lambda validator: len(validator[1])
+)
+_PACKUMENT_LOCKS: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+async def _spawn_npm(args: List[str], cwd: Optional[str] = None) -> asyncio.subprocess.Process:
+    return await asyncio.create_subprocess_exec(
+        "npm", *args,
+        cwd=cwd,
+        env=NPM_ENV,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.DEVNULL
+    )
+
+async def _run_npm(args: List[str], timeout: float, cwd: Optional[str] = None) -> Tuple[int, bytes]:
+    """Run an npm command without blocking the event loop"""
+    proc = await _spawn_npm(args, cwd)
+    try:
+        stdout, _ = await asyncio.wait_for(proc.communicate(), timeout=timeout)
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        raise
+    return proc.returncode, stdout
+
+def _kill(proc: asyncio.subprocess.Process) -> None:
+    if proc.returncode is None:
+        proc.kill()
+
+async def _reap(proc: asyncio.subprocess.Process, timeout: float = 10) -> None:
+    """Wait for an npm process to exit, draining unread output so it cannot block on a full pipe"""
+    try:
+        await asyncio.wait_for(asyncio.gather(proc.stdout.read(), proc.wait()), timeout=timeout)
+    except asyncio.TimeoutError:
+        _kill(proc)
+        await proc.wait()
+
+async def _read_outdated(stdout: asyncio.StreamReader) -> List[Dict[str, Any]]:
+    """Format npm outdated entries as they are parsed from its output"""
+    try:
+        return [
+            {
+                "package": package_name,
+                "current": info.get("current"),
+                "wanted": info.get("wanted"),
+                "latest": info.get("latest"),
+                "location": info.get("location", "")
+            }
+            async for package_name, info in ijson.kvitems_async(stdout, "")
+        ]
+    except ijson.JSONError:
+        return []
+
+@asynccontextmanager
+async def _npm_project(package_json_content: str) -> AsyncIterator[str]:
+    """Provide a scratch npm project holding package_json_content"""
+    # Directory creation and removal touch the filesystem, so keep them off the event loop
+    temp_dir = await asyncio.to_thread(tempfile.mkdtemp, dir=NPM_WORKDIR_ROOT)
+    try:
+        async with aiofiles.open(os.path.join(temp_dir, "package.json"), 'w') as f:
+            await f.write(package_json_content)
+        yield temp_dir
+    finally:
+        await asyncio.to_thread(shutil.rmtree, temp_dir, True)
+
+async def _load_packument(http: aiohttp.ClientSession, package_name: str) -> Optional[Tuple[bytes, Dict[str, Any]]]:
+    """Fetch a package document from the npm registry as (raw body, parsed), or None if it does not exist"""
+    cached = _PACKUMENT_CACHE.get(package_name)
+    if cached is not None:
+        return cached
+    
+    # Concurrent misses for the same document wait on a single registry request
+    lock = _PACKUMENT_LOCKS.setdefault(package_name, asyncio.Lock())
+    async with lock:
+        cached = _PACKUMENT_CACHE.get(package_name)
+        if cached is not None:
+            return cached
+        
+        headers = {"Accept": "application/json"}
+        validator = _PACKUMENT_ETAGS.get(package_name)
+        if validator is not None:
+            headers["If-None-Match"] = validator[0]
+        
+        url = f"{NPM_REGISTRY_URL}/{quote(package_name, safe='@')}"
+        async with http.get(url, headers=headers) as response:
+            if response.status == 404:
+                return None
+            if response.status == 304 and validator is not None:
+                body = validator[1]
+            else:
+                response.raise_for_status()
+                body = await response.read()
+                etag = response.headers.get("ETag")
+                if etag and len(body) <= PACKUMENT_VALIDATOR_MAX_BYTES:
+                    _PACKUMENT_ETAGS[package_name] = (etag, body)
+        
+        entry = (body, orjson.loads(body))
+        # Documents larger than the whole budget are served but not kept
+        if len(body) <= PACKUMENT_CACHE_MAX_BYTES:
+            _PACKUMENT_CACHE[package_name] = entry
+        return entry
+
+async def _fetch_packument(http: aiohttp.ClientSession, package_name: str) -> Optional[Dict[str, Any]]:
+    """Fetch a parsed package document from the npm registry, or None if it does not exist"""
+    entry = await _load_packument(http, package_name)
+    return entry[1] if entry is not None else None
+
+def _latest_manifest(packument: Dict[str, Any]) -> Dict[str, Any]:
+    """Return the manifest of the version tagged as latest"""
+    latest = packument.get("dist-tags", {}).get("latest")
+    return packument.get("versions", {}).get(latest, {})
+
+async def _view_dependency(http: aiohttp.ClientSession, dependency: str, sem: asyncio.Semaphore) -> Dict[str, Any]:
+    """Look up a single dependency in the npm registry"""
+    try:
+        async with sem:
+            packument = await _fetch_packument(http, dependency)
+    except orjson.JSONDecodeError:
+        return {
+            "package": dependency,
+            "status": "error",
+            "error": "Failed to parse package information"
+        }
+    
+    if packument is None:
+        return {
+            "package": dependency,
+            "status": "not_found"
+        }
+    
+    manifest = _latest_manifest(packument)
+    return {
+        "package": dependency,
+        "latest_version": manifest.get("version"),
+        "description": manifest.get("description", packument.get("description")),
+        "author": manifest.get("author", packument.get("author")),
+        "license": manifest.get("license", packument.get("license")),
+        "last_modified": packument.get("time", {}).get("modified", packument.get("modified")),
+        "status": "found"
+    }
+
+async def _bounded(sem: asyncio.Semaphore, aw: Awaitable[Any]) -> Any:
+    """Await under a concurrency limit"""
+    async with sem:
+        return await aw
+
+def _classify_license(license_info: Any) -> str:
+    """Classify license risk"""
+    if not isinstance(license_info, str):
+        return "low"
+    if license_info in _HIGH_RISK_LICENSES:
+        return "high"
+    if license_info in _MEDIUM_RISK_LICENSES:
+        return "medium"
+    return "low"
+
+def _resolve_version(packument: Dict[str, Any], spec: Any) -> Optional[str]:
+    """Pick the published version a package.json spec refers to"""
+    dist_tags = packument.get("dist-tags", {})
+    # Malformed entries (null, objects, numbers) resolve like an unknown range
+    if not isinstance(spec, str):
+        return dist_tags.get("latest")
+    
+    versions = packument.get("versions", {})
+    candidate = spec.strip().lstrip("^~=v")
+    if candidate in versions:
+        return candidate
+    return dist_tags.get(spec, dist_tags.get("latest"))
+
+async def _run_audit(package_json_content: str) -> Dict[str, Any]:
+    """Run npm audit against package_json_content"""
+    # Create temporary project directory for npm audit
+    async with _npm_project(package_json_content) as temp_dir:
+        # Run npm audit command
+        _, stdout = await _run_npm(["audit", "--json"], timeout=60, cwd=temp_dir)
+    
+    audit_output = {}
+    if stdout:
+        try:
+            audit_output = orjson.loads(stdout)
+        except orjson.JSONDecodeError:
+            audit_output = {"error": "Failed to parse npm audit output"}
+    
+    return {
+        "status": "completed",
+        "audit_results": audit_output,
+        "vulnerabilities_found": audit_output.get("metadata", {}).get("vulnerabilities", {}).get("total", 0),
+        "summary": audit_output.get("metadata", {})
+    }
+
+async def _audit_once(package_json_content: str) -> Dict[str, Any]:
+    """Share one npm audit run between concurrent requests for the same package.json"""
+    key = hashlib.blake2b(package_json_content.encode(), digest_size=16).hexdigest()
+    task = _AUDITS_IN_FLIGHT.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_run_audit(package_json_content))
+        _AUDITS_IN_FLIGHT[key] = task
+        task.add_done_callback(lambda _: _AUDITS_IN_FLIGHT.pop(key, None))
+    # Shield the shared run so one client disconnecting does not cancel it for the others
+    return await asyncio.shield(task)
+
+@router.post("/npm-audit", response_model=None)
 async def npm_security_audit(
     request: NPMAuditRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ) -> Dict[str, Any]:
     """Perform npm security audit on package.json content"""
     
     try:
-        # Create temporary directory for npm audit
-        with tempfile.TemporaryDirectory() as temp_dir:
-            package_json_path = os.path.join(temp_dir, "package.json")
-            
-            # Write package.json content to temporary file
-            with open(package_json_path, 'w') as f:
-                f.write(request.package_json_content)
-            
-            # Run npm audit command
-            result = subprocess.run(
-                ["npm", "audit", "--json"],
-                cwd=temp_dir,
-                capture_output=True,
-                text=True,
-                timeout=60
-            )
-            
-            audit_output = {}
-            if result.stdout:
-                try:
-                    audit_output = json.loads(result.stdout)
-                except json.JSONDecodeError:
-                    audit_output = {"error": "Failed to parse npm audit output"}
-            
-            return {
-                "status": "completed",
-                "audit_results": audit_output,
-                "vulnerabilities_found": audit_output.get("metadata", {}).get("vulnerabilities", {}).get("total", 0),
-                "summary": audit_output.get("metadata", {})
-            }
-            
-    except subprocess.TimeoutExpired:
+        return await _audit_once(request.package_json_content)
+    except asyncio.TimeoutError:
         raise HTTPException(status_code=408, detail="npm audit timed out")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"npm audit failed: {str(e)}")
 
-@router.post("/dependency-check")
+@router.post("/dependency-check", response_model=None)
 async def dependency_vulnerability_check(
     request: DependencyCheckRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
+    http: aiohttp.ClientSession = Depends(get_http_session),
     current_user: User = Depends(get_current_user)
 ) -> Dict[str, Any]:
     """Check specific dependencies for known vulnerabilities"""
     
     try:
-        results = []
+        # Look each distinct package up once, however often it is listed
+        packages = list(dict.fromkeys(request.dependencies))
+        sem = asyncio.Semaphore(NPM_VIEW_CONCURRENCY)
+        views = await asyncio.gather(
+            *[_view_dependency(http, package, sem) for package in packages],
+            return_exceptions=True
+        )
+        views_by_package = dict(zip(packages, views))
         
+        results = []
         for dependency in request.dependencies:
-            # Use npm view to get package information
-            result = subprocess.run(
-                ["npm", "view", dependency, "--json"],
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
-            
-            if result.returncode == 0:
-                try:
-                    package_info = json.loads(result.stdout)
-                    results.append({
-                        "package": dependency,
-                        "latest_version": package_info.get("version"),
-                        "description": package_info.get("description"),
-                        "author": package_info.get("author"),
-                        "license": package_info.get("license"),
-                        "last_modified": package_info.get("time", {}).get("modified"),
-                        "status": "found"
-                    })
-                except json.JSONDecodeError:
-                    results.append({
-                        "package": dependency,
-                        "status": "error",
-                        "error": "Failed to parse package information"
-                    })
-            else:
+            view = views_by_package[dependency]
+            if isinstance(view, Exception):
                 results.append({
                     "package": dependency,
-                    "status": "not_found"
+                    "status": "error",
+                    "error": str(view)
                 })
+            else:
+                results.append(view)
         
         return {
             "status": "completed",
@@ -112,62 +326,55 @@ async def dependency_vulnerability_check(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Dependency check failed: {str(e)}")
 
-@router.post("/license-scan")
+@router.post("/license-scan", response_model=None)
 async def license_compliance_scan(
     request: LicenseScanRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
+    http: aiohttp.ClientSession = Depends(get_http_session),
     current_user: User = Depends(get_current_user)
 ) -> Dict[str, Any]:
     """Scan dependencies for license compliance issues"""
     
     try:
         # Parse package.json
-        package_data = json.loads(request.package_json_content)
-        dependencies = {**package_data.get("dependencies", {}), **package_data.get("devDependencies", {})}
+        package_data = orjson.loads(request.package_json_content)
         
-        license_results = []
+        # A package listed in both sections is scanned once, with its devDependencies range
+        dependencies = list({
+            **package_data.get("dependencies", {}),
+            **package_data.get("devDependencies", {})
+        }.items())
+        
+        # One packument per dependency carries the license of every published version
+        sem = asyncio.Semaphore(NPM_VIEW_CONCURRENCY)
+        packuments = await asyncio.gather(
+            *[_bounded(sem, _fetch_packument(http, package_name)) for package_name, _ in dependencies],
+            return_exceptions=True
+        )
         
-        for package_name, version in dependencies.items():
-            # Get package license information
-            result = subprocess.run(
-                ["npm", "view", package_name, "license", "--json"],
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
+        license_results = []
+        for (package_name, version), packument in zip(dependencies, packuments):
+            if packument is None:
+                continue
+            
+            if isinstance(packument, Exception):
+                license_info = "Unknown"
+                risk_level = "unknown"
+            else:
+                manifest = packument.get("versions", {}).get(_resolve_version(packument, version), {})
+                license_info = manifest.get("license", packument.get("license")) or "Unknown"
+                risk_level = _classify_license(license_info)
             
-            if result.returncode == 0:
-                try:
-                    license_info = json.loads(result.stdout) if result.stdout.strip() != '""' else "Unknown"
-                    
-                    # Classify license risk
-                    risk_level = "low"
-                    if license_info in ["GPL-2.0", "GPL-3.0", "AGPL-3.0"]:
-                        risk_level = "high"
-                    elif license_info in ["LGPL-2.1", "LGPL-3.0"]:
-                        risk_level = "medium"
-                    
-                    license_results.append({
-                        "package": package_name,
-                        "version": version,
-                        "license": license_info,
-                        "risk_level": risk_level
-                    })
-                except json.JSONDecodeError:
-                    license_results.append({
-                        "package": package_name,
-                        "version": version,
-                        "license": "Unknown",
-                        "risk_level": "unknown"
-                    })
+            license_results.append({
+                "package": package_name,
+                "version": version,
+                "license": license_info,
+                "risk_level": risk_level
+            })
         
         # Summarize results
-        risk_summary = {
-            "high": sum(1 for r in license_results if r["risk_level"] == "high"),
-            "medium": sum(1 for r in license_results if r["risk_level"] == "medium"),
-            "low": sum(1 for r in license_results if r["risk_level"] == "low"),
-            "unknown": sum(1 for r in license_results if r["risk_level"] == "unknown")
-        }
+        risk_counts = Counter(r["risk_level"] for r in license_results)
+        risk_summary = {level: risk_counts[level] for level in ("high", "medium", "low", "unknown")}
         
         return {
             "status": "completed",
@@ -176,54 +383,31 @@ async def license_compliance_scan(
             "license_details": license_results
         }
         
-    except json.JSONDecodeError:
+    except orjson.JSONDecodeError:
         raise HTTPException(status_code=400, detail="Invalid package.json content")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"License scan failed: {str(e)}")
 
-@router.post("/outdated-packages")
+@router.post("/outdated-packages", response_model=None)
 async def check_outdated_packages(
     request: OutdatedPackagesRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ) -> Dict[str, Any]:
     """Check for outdated packages in package.json"""
     
     try:
-        # Create temporary directory
-        with tempfile.TemporaryDirectory() as temp_dir:
-            package_json_path = os.path.join(temp_dir, "package.json")
-            
-            # Write package.json content
-            with open(package_json_path, 'w') as f:
-                f.write(request.package_json_content)
-            
-            # Run npm outdated command
-            result = subprocess.run(
-                ["npm", "outdated", "--json"],
-                cwd=temp_dir,
-                capture_output=True,
-                text=True,
-                timeout=60
-            )
-            
-            outdated_packages = {}
-            if result.stdout:
-                try:
-                    outdated_packages = json.loads(result.stdout)
-                except json.JSONDecodeError:
-                    pass
-            
-            # Format results
-            formatted_results = []
-            for package_name, info in outdated_packages.items():
-                formatted_results.append({
-                    "package": package_name,
-                    "current": info.get("current"),
-                    "wanted": info.get("wanted"),
-                    "latest": info.get("latest"),
-                    "location": info.get("location", "")
-                })
+        # Create temporary project directory
+        async with _npm_project(request.package_json_content) as temp_dir:
+            # Run npm outdated command, parsing its output as it streams in
+            proc = await _spawn_npm(["outdated", "--json"], cwd=temp_dir)
+            try:
+                formatted_results = await asyncio.wait_for(_read_outdated(proc.stdout), timeout=60)
+            except BaseException:
+                _kill(proc)
+                raise
+            finally:
+                await _reap(proc)
             
             return {
                 "status": "completed",
@@ -234,27 +418,32 @@ async def check_outdated_packages(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Outdated packages check failed: {str(e)}")
 
-@router.get("/package-info/{package_name}")
+@router.get("/package-info/{package_name}", response_model=None)
 async def get_package_info(
     package_name: str,
-    db: Session = Depends(get_db),
+    full: bool = False,
+    db: AsyncSession = Depends(get_async_db),
+    http: aiohttp.ClientSession = Depends(get_http_session),
     current_user: User = Depends(get_current_user)
-) -> Dict[str, Any]:
+) -> Union[Dict[str, Any], Response]:
     """Get detailed information about a specific npm package"""
     
+    if len(package_name) > _NAME_MAX_LENGTH or not _NAME_RE.fullmatch(package_name):
+        raise HTTPException(status_code=422, detail="Invalid package name")
+    
     try:
-        # Get package information from npm
-        result = subprocess.run(
-            ["npm", "view", package_name, "--json"],
-            capture_output=True,
-            text=True,
-            timeout=30
-        )
+        # Get package information from the npm registry
+        entry = await _load_packument(http, package_name)
         
-        if result.returncode != 0:
+        if entry is None:
             raise HTTPException(status_code=404, detail=f"Package '{package_name}' not found")
+        body, packument = entry
+        
+        # Pass the registry's own bytes through untouched instead of re-encoding them
+        if full:
+            return Response(content=body, media_type="application/json")
         
-        package_info = json.loads(result.stdout)
+        package_info = {**packument, **_latest_manifest(packument)}
         
         # Extract relevant information
         return {
@@ -273,7 +462,9 @@ async def get_package_info(
             "maintainers": package_info.get("maintainers", [])
         }
         
-    except json.JSONDecodeError:
+    except HTTPException:
+        raise
+    except orjson.JSONDecodeError:
         raise HTTPException(status_code=500, detail="Failed to parse package information")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get package info: {str(e)}")
\ No newline at end of file
@@ -1,8 +1,10 @@
+import aiohttp
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Dict, Any
 
-from app.core.database import get_db
+from app.core.database import get_async_db
+from app.core.http import get_http_session
 from app.api.auth import get_current_user
 from app.models.models import User
 from app.schemas.schemas import (
@@ -18,17 +20,20 @@ from app.services.recon_service import (
 
 router = APIRouter()
 
+# Shared so its answer cache outlives individual requests
+_DNS = DNSService()
+_RECON = ReconService(_DNS)
+
 @router.post("/subdomain")
 async def subdomain_enumeration(
     request: SubdomainScanRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ) -> Dict[str, Any]:
     """Perform subdomain enumeration"""
     
     try:
-        recon_service = ReconService()
-        results = await recon_service.enumerate_subdomains(
+        results = await _RECON.enumerate_subdomains(
             domain=request.domain,
             tools=request.tools
         )
@@ -46,14 +51,13 @@ async def subdomain_enumeration(
 @router.post("/port-scan")
 async def port_scanning(
     request: PortScanRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ) -> Dict[str, Any]:
     """Perform port scanning"""
     
     try:
-        recon_service = ReconService()
-        results = await recon_service.port_scan(
+        results = await _RECON.port_scan(
             target=request.target,
             scan_type=request.scan_type,
             ports=request.ports
@@ -72,14 +76,13 @@ async def port_scanning(
 @router.post("/dns-lookup")
 async def dns_lookup(
     request: DNSLookupRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ) -> Dict[str, Any]:
     """Perform DNS lookup"""
     
     try:
-        dns_service = DNSService()
-        results = await dns_service.lookup(
+        results = await _DNS.lookup(
             domain=request.domain,
             record_type=request.record_type
         )
@@ -95,7 +98,7 @@ async def dns_lookup(
 @router.get("/whois/{domain}")
 async def whois_lookup(
     domain: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ) -> Dict[str, Any]:
     """Perform WHOIS lookup"""
@@ -114,14 +117,14 @@ async def whois_lookup(
 @router.get("/tech-stack/{url}")
 async def tech_stack_detection(
     url: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+    http: aiohttp.ClientSession = Depends(get_http_session)
 ) -> Dict[str, Any]:
     """Detect technology stack"""
     
     try:
-        recon_service = ReconService()
-        results = await recon_service.detect_tech_stack(url)
+        results = await _RECON.detect_tech_stack(url, http)
         
         return {
             "url": url,
@@ -1,9 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 import uuid
 
-from app.core.database import get_db
+from app.core.database import get_async_db
 from app.api.auth import get_current_user
 from app.models.models import User, Scan, ScanStatus
 from app.schemas.schemas import ScanCreate, ScanResponse
@@ -11,10 +12,30 @@ from app.services.tasks import subdomain_scan, port_scan, tech_stack_scan
 
 router = APIRouter()
 
+# Background task for each scan type accepted by ScanCreate
+SCAN_TASKS = {
+    "subdomain": subdomain_scan,
+    "port_scan": port_scan,
+    "tech_stack": tech_stack_scan,
+}
+
+# Columns returned by the scan listing; results blobs are only served per scan
+SCAN_LIST_COLUMNS = (
+    Scan.id,
+    Scan.target,
+    Scan.scan_type,
+    Scan.status,
+    Scan.task_id,
+    Scan.error_message,
+    Scan.created_at,
+    Scan.completed_at,
+    Scan.user_id,
+)
+
 @router.post("/", response_model=ScanResponse)
 async def create_scan(
     scan: ScanCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Create a new scan job"""
@@ -28,25 +49,14 @@ async def create_scan(
         scan_type=scan.scan_type,
         task_id=task_id,
         user_id=current_user.id,
-        status=ScanStatus.PENDING
+        status=ScanStatus.PENDING.value
     )
     db.add(db_scan)
-    db.commit()
-    db.refresh(db_scan)
+    await db.commit()
+    await db.refresh(db_scan)
     
     # Start appropriate background task
-    if scan.scan_type == "subdomain":
-        subdomain_scan.delay(db_scan.id, scan.target)
-    elif scan.scan_type == "port_scan":
-        port_scan.delay(db_scan.id, scan.target)
-    elif scan.scan_type == "tech_stack":
-        tech_stack_scan.delay(db_scan.id, scan.target)
-    else:
-        # Update scan status to failed
-        db_scan.status = ScanStatus.FAILED
-        db_scan.error_message = f"Unsupported scan type: {scan.scan_type}"
-        db.commit()
-        raise HTTPException(status_code=400, detail=f"Unsupported scan type: {scan.scan_type}")
+    SCAN_TASKS[scan.scan_type].delay(db_scan.id, scan.target)
     
     return db_scan
 
@@ -54,26 +64,30 @@ async def create_scan(
 async def get_scans(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    before_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get user's scans"""
-    scans = db.query(Scan).filter(
-        Scan.user_id == current_user.id
-    ).offset(skip).limit(limit).all()
-    return scans
+    """Get user's scans, newest first. Pass the last seen id as before_id to fetch the next page."""
+    query = select(*SCAN_LIST_COLUMNS).where(Scan.user_id == current_user.id)
+    if before_id is not None:
+        query = query.where(Scan.id < before_id)
+    else:
+        query = query.offset(skip)
+    
+    rows = (await db.execute(query.order_by(Scan.id.desc()).limit(limit))).all()
+    return [ScanResponse.model_validate(row) for row in rows]
 
 @router.get("/{scan_id}", response_model=ScanResponse)
 async def get_scan(
     scan_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get specific scan by ID"""
-    scan = db.query(Scan).filter(
-        Scan.id == scan_id,
-        Scan.user_id == current_user.id
-    ).first()
+    scan = (await db.execute(
+        select(Scan).where(Scan.id == scan_id, Scan.user_id == current_user.id)
+    )).scalar_one_or_none()
     
     if not scan:
         raise HTTPException(status_code=404, detail="Scan not found")
@@ -83,19 +97,18 @@ async def get_scan(
 @router.delete("/{scan_id}")
 async def delete_scan(
     scan_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Delete a scan"""
-    scan = db.query(Scan).filter(
-        Scan.id == scan_id,
-        Scan.user_id == current_user.id
-    ).first()
+    # Delete in one statement; the row (and its results) is never loaded
+    result = await db.execute(
+        delete(Scan).where(Scan.id == scan_id, Scan.user_id == current_user.id)
+    )
     
-    if not scan:
+    if not result.rowcount:
         raise HTTPException(status_code=404, detail="Scan not found")
     
-    db.delete(scan)
-    db.commit()
+    await db.commit()
     
     return {"message": "Scan deleted successfully"}
\ No newline at end of file
@@ -1,31 +1,106 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.exceptions import RequestValidationError
+from pydantic import ValidationError
 from sqlalchemy.orm import Session
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
 import hashlib
-import requests
-import re
 import base64
 import subprocess
 import tempfile
 import os
+import socket
+import ssl
+import threading
+import time
+import ahocorasick
+import asyncio
+import math
+import dns.asyncresolver
+import dns.resolver
+from rbloom import Bloom
+from cachetools import TTLCache
+from datetime import datetime
+from functools import reduce
+from operator import or_
 
+from app.core.breach import get_breach_filters
 from app.core.database import get_db
 from app.api.auth import get_current_user
 from app.models.models import User
+from app.schemas.schemas import PasswordStrengthRequest, HashCheckRequest, SSLCheckRequest, EmailSecurityRequest, SubdomainTakeoverRequest
 
 router = APIRouter()
 
-@router.post("/password-strength")
-async def analyze_password_strength(
-    request_data: Dict[str, str],
+# Shared resolvers whose common cache answers repeat lookups until the records' TTLs expire
+RESOLVER = dns.resolver.Resolver()
+RESOLVER.cache = dns.resolver.LRUCache(max_size=10000)
+ASYNC_RESOLVER = dns.asyncresolver.Resolver()
+ASYNC_RESOLVER.cache = RESOLVER.cache
+
+# Built once: loading the system CA bundle is the expensive part of a default context
+_SSL_CONTEXT = ssl.create_default_context()
+
+# Certificate checks per domain; failures are remembered only briefly so fixes show up quickly
+_SSL_CACHE = TTLCache(maxsize=1024, ttl=3600)
+_SSL_ERROR_CACHE = TTLCache(maxsize=1024, ttl=300)
+# The SSL check runs in the threadpool and TTLCache is not thread-safe
+_SSL_CACHE_LOCK = threading.Lock()
+
+# CNAME targets of services prone to subdomain takeover
+TAKEOVER_FINGERPRINTS = {
+    'github.io': 'GitHub Pages',
+    'herokuapp.com': 'Heroku',
+    'amazonaws.com': 'AWS',
+    'azurewebsites.net': 'Azure',
+    'netlify.com': 'Netlify',
+    'surge.sh': 'Surge.sh'
+}
+_TAKEOVER_AUTOMATON = ahocorasick.Automaton()
+for _pattern, _service in TAKEOVER_FINGERPRINTS.items():
+    _TAKEOVER_AUTOMATON.add_word(_pattern, _service)
+_TAKEOVER_AUTOMATON.make_automaton()
+
+# Character classes counted towards password strength, as bit flags per byte
+_CHAR_LOWER, _CHAR_UPPER, _CHAR_DIGIT, _CHAR_SYMBOL = 1, 2, 4, 8
+_CHAR_CLASSES = bytes(
+    _CHAR_LOWER if 'a' <= chr(b) <= 'z' else
+    _CHAR_UPPER if 'A' <= chr(b) <= 'Z' else
+    _CHAR_DIGIT if '0' <= chr(b) <= '9' else
+    _CHAR_SYMBOL if chr(b) in '!@#$%^&*(),.?":{}|<>' else 0
+    for b in range(256)
+)
+_CHAR_CLASS_SIZES = ((_CHAR_LOWER, 26), (_CHAR_UPPER, 26), (_CHAR_DIGIT, 10), (_CHAR_SYMBOL, 32))
+
+# Common password fragments, matched in a single pass over the lowercased password
+COMMON_PATTERNS = ('123', 'abc', 'password', 'admin', 'qwerty')
+_COMMON_AUTOMATON = ahocorasick.Automaton()
+for _pattern in COMMON_PATTERNS:
+    _COMMON_AUTOMATON.add_word(_pattern, _pattern)
+_COMMON_AUTOMATON.make_automaton()
+
+# Hex digest length per supported hash type
+_EXPECTED_LENGTHS = {'MD5': 32, 'SHA1': 40, 'SHA256': 64}
+
+# Digests of "hello", used when no breach filter is loaded for a hash type
+_DEMO_BREACHED = {
+    'MD5': frozenset({bytes.fromhex('5D41402ABC4B2A76B9719D911017C592')}),
+    'SHA1': frozenset({bytes.fromhex('AAF4C61DDCC5E8A2DABEDE0F3B482CD9AEA9434D')}),
+    'SHA256': frozenset({bytes.fromhex('2CF24DBA5FB0A30E26E83B2AC5B9E29E1B161E5C1FA7425E73043362938B9824')})
+}
+
+def _find_rdn(rdns: Tuple[Tuple[Tuple[str, str], ...], ...], key: str) -> str:
+    """Look up an attribute in a certificate subject or issuer as returned by getpeercert()"""
+    return next((value for rdn in rdns for name, value in rdn if name == key), 'Unknown')
+
+@router.post("/password-strength", response_model=None)
+def analyze_password_strength(
+    request: PasswordStrengthRequest,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ) -> Dict[str, Any]:
     """Analyze password strength and provide recommendations"""
     
-    password = request_data.get("password")
-    if not password:
-        raise HTTPException(status_code=400, detail="Password is required")
+    password = request.password
     
     try:
         score = 0
@@ -39,34 +114,39 @@ async def analyze_password_strength(
         else:
             recommendations.append("Use at least 8 characters (12+ recommended)")
         
-        # Character variety checks
-        if re.search(r'[a-z]', password):
+        # Character variety checks, classified in one pass over the password
+        char_classes = reduce(or_, password.encode().translate(_CHAR_CLASSES), 0)
+        
+        if char_classes & _CHAR_LOWER:
             score += 1
         else:
             recommendations.append("Include lowercase letters")
             
-        if re.search(r'[A-Z]', password):
+        if char_classes & _CHAR_UPPER:
             score += 1
         else:
             recommendations.append("Include uppercase letters")
             
-        if re.search(r'\d', password):
+        if char_classes & _CHAR_DIGIT:
             score += 1
         else:
             recommendations.append("Include numbers")
             
-        if re.search(r'[!@#$%^&*(),.?":{}|<>]', password):
+        if char_classes & _CHAR_SYMBOL:
             score += 1
         else:
             recommendations.append("Include special characters")
         
         # Common patterns check
-        common_patterns = ['123', 'abc', 'password', 'admin', 'qwerty']
-        for pattern in common_patterns:
-            if pattern.lower() in password.lower():
+        found_patterns = {pattern for _, pattern in _COMMON_AUTOMATON.iter(password.lower())}
+        for pattern in COMMON_PATTERNS:
+            if pattern in found_patterns:
                 score -= 1
                 recommendations.append(f"Avoid common patterns like '{pattern}'")
         
+        # Entropy estimate from the size of the character classes in use
+        charset_size = sum(size for flag, size in _CHAR_CLASS_SIZES if char_classes & flag)
+        
         # Strength assessment
         if score >= 6:
             strength = "Very Strong"
@@ -87,50 +167,55 @@ async def analyze_password_strength(
             "max_score": 6,
             "color": color,
             "recommendations": recommendations,
-            "entropy": len(set(password)) * len(password) // 2
+            "entropy": int(len(password) * math.log2(charset_size)) if charset_size else 0
         }
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Password analysis failed: {str(e)}")
 
-@router.post("/hash-check")
-async def check_hash_leaks(
-    hash_value: str,
-    hash_type: str,
+def _from_query(model, **params):
+    """Build a request model from the deprecated query-parameter form, reporting bad input as a 422"""
+    try:
+        return model.model_validate({k: v for k, v in params.items() if v is not None})
+    except ValidationError as e:
+        raise RequestValidationError([{**err, "loc": ("query", *err["loc"])} for err in e.errors()])
+
+@router.post("/hash-check", response_model=None)
+def check_hash_leaks(
+    request: Optional[HashCheckRequest] = None,
+    hash_value: Optional[str] = Query(None, deprecated=True),
+    hash_type: Optional[str] = Query(None, deprecated=True),
     db: Session = Depends(get_db),
+    breach_filters: Dict[str, Bloom] = Depends(get_breach_filters),
     current_user: User = Depends(get_current_user)
 ) -> Dict[str, Any]:
     """Check if a hash has been found in data breaches"""
     
+    if request is None:
+        request = _from_query(HashCheckRequest, hash_value=hash_value, hash_type=hash_type)
+    
     try:
-        # Normalize hash
-        hash_value = hash_value.upper().strip()
-        
-        # Basic validation
-        valid_types = ['MD5', 'SHA1', 'SHA256']
-        if hash_type.upper() not in valid_types:
-            raise HTTPException(status_code=400, detail=f"Unsupported hash type. Use: {', '.join(valid_types)}")
+        # Normalize hash; the request model has already checked type and hex format
+        hash_value = request.hash_value.upper().strip()
+        hash_type = request.hash_type.upper()
         
         # Length validation
-        expected_lengths = {'MD5': 32, 'SHA1': 40, 'SHA256': 64}
-        if len(hash_value) != expected_lengths[hash_type.upper()]:
-            raise HTTPException(status_code=400, detail=f"{hash_type} hash should be {expected_lengths[hash_type.upper()]} characters")
+        expected_length = _EXPECTED_LENGTHS[hash_type]
+        if len(hash_value) != expected_length:
+            raise HTTPException(status_code=400, detail=f"{hash_type} hash should be {expected_length} characters")
         
-        # For demo purposes, simulate breach check
-        # In production, this would check against breach databases
+        digest = bytes.fromhex(hash_value)
         
-        # Simulate some common leaked hashes
-        known_breached = {
-            'MD5': ['5D41402ABC4B2A76B9719D911017C592'],  # "hello"
-            'SHA1': ['AAF4C61DCC5E07D2CEE2B971E2E3A55F9968C300'],  # "hello"  
-            'SHA256': ['2CF24DBA4F21D4288D0EE33E0FF7C4EFE6FB2078FC7E5ED8E6F04F4F7EF9E5']  # "hello"
-        }
-        
-        is_breached = hash_value in known_breached.get(hash_type.upper(), [])
+        breach_filter = breach_filters.get(hash_type)
+        if breach_filter is not None:
+            is_breached = digest in breach_filter
+        else:
+            # No breach filter configured for this hash type; fall back to demo data
+            is_breached = digest in _DEMO_BREACHED[hash_type]
         
         return {
             "hash": hash_value,
-            "hash_type": hash_type.upper(),
+            "hash_type": hash_type,
             "is_breached": is_breached,
             "breach_count": 1 if is_breached else 0,
             "risk_level": "HIGH" if is_breached else "LOW",
@@ -142,42 +227,39 @@ async def check_hash_leaks(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Hash check failed: {str(e)}")
 
-@router.post("/ssl-check")
-async def ssl_certificate_check(
-    request_data: Dict[str, str],
+@router.post("/ssl-check", response_model=None)
+def ssl_certificate_check(
+    request: SSLCheckRequest,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ) -> Dict[str, Any]:
     """Check SSL certificate security for a domain"""
     
-    domain = request_data.get("domain")
-    if not domain:
-        raise HTTPException(status_code=400, detail="Domain is required")
+    domain = request.domain
     
     try:
-        import ssl
-        import socket
-        from datetime import datetime
-        
         # Clean domain
         domain = domain.replace('https://', '').replace('http://', '').split('/')[0]
         
-        context = ssl.create_default_context()
+        with _SSL_CACHE_LOCK:
+            cached = _SSL_CACHE.get(domain) or _SSL_ERROR_CACHE.get(domain)
+        if cached is not None:
+            return cached
         
         with socket.create_connection((domain, 443), timeout=10) as sock:
-            with context.wrap_socket(sock, server_hostname=domain) as ssock:
+            with _SSL_CONTEXT.wrap_socket(sock, server_hostname=domain) as ssock:
                 cert = ssock.getpeercert()
                 
                 # Extract certificate information
-                subject = dict(x[0] for x in cert['subject'])
-                issuer = dict(x[0] for x in cert['issuer'])
+                common_name = _find_rdn(cert['subject'], 'commonName')
+                issuer = _find_rdn(cert['issuer'], 'organizationName')
                 
                 # Parse dates
-                not_before = datetime.strptime(cert['notBefore'], '%b %d %H:%M:%S %Y %Z')
-                not_after = datetime.strptime(cert['notAfter'], '%b %d %H:%M:%S %Y %Z')
+                not_before = ssl.cert_time_to_seconds(cert['notBefore'])
+                not_after = ssl.cert_time_to_seconds(cert['notAfter'])
                 
                 # Calculate days until expiration
-                days_until_expiry = (not_after - datetime.now()).days
+                days_until_expiry = int((not_after - time.time()) // 86400)
                 
                 # Security assessment
                 warnings = []
@@ -187,20 +269,23 @@ async def ssl_certificate_check(
                     warnings.append("Certificate has expired")
                 
                 # Check for wildcard
-                is_wildcard = subject.get('commonName', '').startswith('*.')
+                is_wildcard = common_name.startswith('*.')
                 
-                return {
+                result = {
                     "domain": domain,
                     "valid": True,
-                    "subject": subject.get('commonName', 'Unknown'),
-                    "issuer": issuer.get('organizationName', 'Unknown'),
-                    "valid_from": not_before.isoformat(),
-                    "valid_until": not_after.isoformat(),
+                    "subject": common_name,
+                    "issuer": issuer,
+                    "valid_from": datetime.utcfromtimestamp(not_before),
+                    "valid_until": datetime.utcfromtimestamp(not_after),
                     "days_until_expiry": days_until_expiry,
                     "is_wildcard": is_wildcard,
                     "warnings": warnings,
                     "security_score": max(0, 100 - len(warnings) * 20 - max(0, 30 - days_until_expiry))
                 }
+                with _SSL_CACHE_LOCK:
+                    _SSL_CACHE[domain] = result
+                return result
                 
     except socket.gaierror:
         # In sandboxed environment or when DNS fails, provide mock response
@@ -220,34 +305,30 @@ async def ssl_certificate_check(
     except socket.timeout:
         raise HTTPException(status_code=408, detail="Connection timeout")
     except ssl.SSLError as e:
-        return {
+        result = {
             "domain": domain,
             "valid": False,
             "error": str(e),
             "security_score": 0
         }
+        with _SSL_CACHE_LOCK:
+            _SSL_ERROR_CACHE[domain] = result
+        return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"SSL check failed: {str(e)}")
 
-@router.post("/email-security")
+@router.post("/email-security", response_model=None)
 async def email_security_check(
-    request_data: Dict[str, str],
+    request: EmailSecurityRequest,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ) -> Dict[str, Any]:
     """Check email security settings and potential issues"""
     
-    email = request_data.get("email")
-    if not email:
-        raise HTTPException(status_code=400, detail="Email is required")
+    email = request.email
     
     try:
-        import dns.resolver
-        
         # Extract domain from email
-        if '@' not in email:
-            raise HTTPException(status_code=400, detail="Invalid email format")
-        
         domain = email.split('@')[1]
         
         results = {
@@ -260,38 +341,41 @@ async def email_security_check(
             "recommendations": []
         }
         
+        # MX, SPF and DMARC lookups are independent, so issue them together
+        mx_records, txt_records, dmarc_records = await asyncio.gather(
+            ASYNC_RESOLVER.resolve(domain, 'MX'),
+            ASYNC_RESOLVER.resolve(domain, 'TXT'),
+            ASYNC_RESOLVER.resolve(f'_dmarc.{domain}', 'TXT'),
+            return_exceptions=True
+        )
+        
         # Check MX records
-        try:
-            mx_records = dns.resolver.resolve(domain, 'MX')
+        if isinstance(mx_records, Exception):
+            results["recommendations"].append("No MX records found")
+        else:
             results["mx_records"] = [str(mx) for mx in mx_records]
             results["security_score"] += 20
-        except:
-            results["recommendations"].append("No MX records found")
         
         # Check SPF record
-        try:
-            txt_records = dns.resolver.resolve(domain, 'TXT')
-            for record in txt_records:
-                if 'v=spf1' in str(record):
-                    results["spf_record"] = str(record)
+        if not isinstance(txt_records, Exception):
+            for rdata in txt_records:
+                record = b''.join(rdata.strings)
+                if record.startswith(b'v=spf1'):
+                    results["spf_record"] = record.decode('ascii', 'replace')
                     results["security_score"] += 30
                     break
-            if not results["spf_record"]:
-                results["recommendations"].append("Configure SPF record to prevent email spoofing")
-        except:
+        if not results["spf_record"]:
             results["recommendations"].append("Configure SPF record to prevent email spoofing")
         
         # Check DMARC record
-        try:
-            dmarc_records = dns.resolver.resolve(f'_dmarc.{domain}', 'TXT')
-            for record in dmarc_records:
-                if 'v=DMARC1' in str(record):
-                    results["dmarc_record"] = str(record)
+        if not isinstance(dmarc_records, Exception):
+            for rdata in dmarc_records:
+                record = b''.join(rdata.strings)
+                if record.startswith(b'v=DMARC1'):
+                    results["dmarc_record"] = record.decode('ascii', 'replace')
                     results["security_score"] += 50
                     break
-            if not results["dmarc_record"]:
-                results["recommendations"].append("Configure DMARC record for email authentication")
-        except:
+        if not results["dmarc_record"]:
             results["recommendations"].append("Configure DMARC record for email authentication")
         
         # Overall assessment
@@ -311,19 +395,21 @@ async def email_security_check(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Email security check failed: {str(e)}")
 
-@router.post("/subdomain-takeover")
-async def check_subdomain_takeover(
-    subdomain: str,
+@router.post("/subdomain-takeover", response_model=None)
+def check_subdomain_takeover(
+    request: Optional[SubdomainTakeoverRequest] = None,
+    subdomain: Optional[str] = Query(None, deprecated=True),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ) -> Dict[str, Any]:
     """Check for potential subdomain takeover vulnerabilities"""
     
+    if request is None:
+        request = _from_query(SubdomainTakeoverRequest, subdomain=subdomain)
+    
     try:
-        import dns.resolver
-        
         # Clean subdomain
-        subdomain = subdomain.replace('https://', '').replace('http://', '').split('/')[0]
+        subdomain = request.subdomain.replace('https://', '').replace('http://', '').split('/')[0]
         
         results = {
             "subdomain": subdomain,
@@ -336,27 +422,17 @@ async def check_subdomain_takeover(
         
         # Check CNAME record
         try:
-            cname_records = dns.resolver.resolve(subdomain, 'CNAME')
+            cname_records = RESOLVER.resolve(subdomain, 'CNAME')
             if cname_records:
                 cname = str(cname_records[0])
                 results["cname_record"] = cname
                 
                 # Check for known vulnerable services
-                vulnerable_patterns = {
-                    'github.io': 'GitHub Pages',
-                    'herokuapp.com': 'Heroku',
-                    'amazonaws.com': 'AWS',
-                    'azurewebsites.net': 'Azure',
-                    'netlify.com': 'Netlify',
-                    'surge.sh': 'Surge.sh'
-                }
-                
-                for pattern, service in vulnerable_patterns.items():
-                    if pattern in cname:
-                        results["service_detected"] = service
-                        results["risk_level"] = "MEDIUM"
-                        results["recommendations"].append(f"Verify {service} configuration to prevent takeover")
-                        break
+                for _, service in _TAKEOVER_AUTOMATON.iter(cname):
+                    results["service_detected"] = service
+                    results["risk_level"] = "MEDIUM"
+                    results["recommendations"].append(f"Verify {service} configuration to prevent takeover")
+                    break
                         
         except dns.resolver.NoAnswer:
             pass
@@ -368,7 +444,7 @@ async def check_subdomain_takeover(
         # Additional checks
         try:
             # Try to resolve A record
-            a_records = dns.resolver.resolve(subdomain, 'A')
+            a_records = RESOLVER.resolve(subdomain, 'A')
             if not a_records:
                 results["risk_level"] = "MEDIUM"
                 results["recommendations"].append("No A records found")
@@ -0,0 +1,38 @@
+import os
+from typing import Dict, Optional
+
+from fastapi import Request
+from rbloom import Bloom
+
+BREACH_HASH_TYPES = ("MD5", "SHA1", "SHA256")
+
+# Sized for the full HIBP corpus when building filters from a hash dump
+BREACH_EXPECTED_ITEMS = 850_000_000
+BREACH_FALSE_POSITIVE_RATE = 1e-6
+
+def breach_hash(digest: bytes) -> int:
+    """Filter hash for a raw digest: its leading 128 bits are already uniformly distributed"""
+    return int.from_bytes(digest[:16], "big", signed=True)
+
+def load_breach_filters(path: Optional[str]) -> Dict[str, Bloom]:
+    """Load the prebuilt <HASH_TYPE>.bloom filters found under path"""
+    filters = {}
+    if not path:
+        return filters
+
+    for hash_type in BREACH_HASH_TYPES:
+        filter_path = os.path.join(path, f"{hash_type}.bloom")
+        if os.path.isfile(filter_path):
+            filters[hash_type] = Bloom.load(filter_path, breach_hash)
+
+    return filters
+
+def build_breach_filter(hashes_path: str, filter_path: str, expected_items: int = BREACH_EXPECTED_ITEMS) -> None:
+    """Build a filter from a HIBP-style dump with one HASH[:COUNT] per line"""
+    bloom = Bloom(expected_items, BREACH_FALSE_POSITIVE_RATE, breach_hash)
+    with open(hashes_path) as f:
+        bloom.update(bytes.fromhex(line.partition(":")[0]) for line in f)
+    bloom.save(filter_path)
+
+def get_breach_filters(request: Request) -> Dict[str, Bloom]:
+    return request.app.state.breach_filters
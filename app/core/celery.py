@@ -9,9 +9,14 @@ celery_app = Celery(
 )
 
 celery_app.conf.update(
-    task_serializer="json",
-    accept_content=["json"],
-    result_serializer="json",
+    task_serializer="msgpack",
+    accept_content=["msgpack", "json"],
+    result_serializer="msgpack",
+    result_accept_content=["msgpack", "json"],
+    result_compression="gzip",
+    # Scans are long-running: take one task at a time and acknowledge it only once done
+    worker_prefetch_multiplier=1,
+    task_acks_late=True,
     timezone="UTC",
     enable_utc=True,
     task_routes={
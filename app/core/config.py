@@ -21,6 +21,8 @@ class Settings(BaseSettings):
     SCAN_RESULTS_PATH: str = "/scans"
     REPORTS_PATH: str = "/reports"
     WORDLISTS_PATH: str = "/wordlists"
+    NPM_CACHE_PATH: str = "/var/cache/npm-audit"
+    BREACH_BLOOM_PATH: Optional[str] = None
     
     # Rate limiting
     RATE_LIMIT_PER_MINUTE: int = 60
@@ -1,11 +1,30 @@
+import orjson
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
 
-engine = create_engine(settings.DATABASE_URL)
+def _json_serializer(value) -> str:
+    # Scanner output may use int keys (status codes, ports); stdlib json accepted them too
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+
+# Scan results are large JSON documents; let orjson handle them on both engines
+JSON_OPTIONS = {"json_serializer": _json_serializer, "json_deserializer": orjson.loads}
+
+engine = create_engine(settings.DATABASE_URL, **JSON_OPTIONS)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Same database through its asyncio driver, for request handlers
+ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+_database_url = make_url(settings.DATABASE_URL)
+async_engine = create_async_engine(
+    _database_url.set(drivername=ASYNC_DRIVERS.get(_database_url.get_backend_name(), _database_url.drivername)),
+    **JSON_OPTIONS
+)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
 def get_db():
@@ -13,4 +32,8 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,13 @@
+import aiohttp
+from fastapi import Request
+
+def create_http_session() -> aiohttp.ClientSession:
+    """Create the keep-alive client shared by outbound API calls"""
+    return aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=50, limit_per_host=10, ttl_dns_cache=300),
+        timeout=aiohttp.ClientTimeout(total=30),
+        headers={"Accept-Encoding": "gzip"}
+    )
+
+def get_http_session(request: Request) -> aiohttp.ClientSession:
+    return request.app.state.http
@@ -1,8 +1,11 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from app.api import auth, scans, recon, vulnerability, npm_security, security_tools
+from app.core.breach import load_breach_filters
 from app.core.config import settings
 from app.core.database import engine
+from app.core.http import create_http_session
 from app.models import models
 import uvicorn
 
@@ -12,7 +15,8 @@ models.Base.metadata.create_all(bind=engine)
 app = FastAPI(
     title="Web Auditor",
     description="Comprehensive Web Security Auditing Platform",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # CORS middleware
@@ -20,10 +24,19 @@ app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:3000"],
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
+    allow_headers=["Authorization", "Content-Type"],
 )
 
+@app.on_event("startup")
+async def startup():
+    app.state.http = create_http_session()
+    app.state.breach_filters = load_breach_filters(settings.BREACH_BLOOM_PATH)
+
+@app.on_event("shutdown")
+async def shutdown():
+    await app.state.http.close()
+
 # Include routers
 app.include_router(auth.router, prefix="/api/auth", tags=["authentication"])
 app.include_router(scans.router, prefix="/api/scans", tags=["scans"])
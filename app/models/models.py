@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, Enum, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, ForeignKey, Index, JSON
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -37,16 +38,21 @@ class Scan(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     target = Column(String, index=True)
-    scan_type = Column(Enum(ScanType))
-    status = Column(Enum(ScanStatus), default=ScanStatus.PENDING)
+    # Stored as the enum values; ScanType/ScanStatus are enforced by the schemas
+    scan_type = Column(String(32), index=True)
+    status = Column(String(32), default=ScanStatus.PENDING.value)
     task_id = Column(String, unique=True, index=True)
-    results = Column(Text)
+    results = Column(JSON().with_variant(JSONB(), "postgresql"))
     error_message = Column(Text)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     completed_at = Column(DateTime(timezone=True))
     user_id = Column(Integer, ForeignKey("users.id"))
     
     user = relationship("User", back_populates="scans")
+    
+    __table_args__ = (
+        Index("ix_scans_user_id_id", "user_id", "id"),
+    )
 
 class Vulnerability(Base):
     __tablename__ = "vulnerabilities"
@@ -63,6 +69,10 @@ class Vulnerability(Base):
     recommendation = Column(Text)
     
     scan = relationship("Scan")
+    
+    __table_args__ = (
+        Index("ix_vuln_scan_sev", "scan_id", "severity"),
+    )
 
 class Report(Base):
     __tablename__ = "reports"
@@ -1,6 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from pydantic import EmailStr
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Literal
 from datetime import datetime
 from app.models.models import ScanType, ScanStatus
 
@@ -34,13 +34,14 @@ class ScanBase(BaseModel):
     scan_type: ScanType
 
 class ScanCreate(ScanBase):
-    pass
+    # Only scan types with a background task can be queued
+    scan_type: Literal["subdomain", "port_scan", "tech_stack"]
 
 class ScanResponse(ScanBase):
     id: int
     status: ScanStatus
     task_id: str
-    results: Optional[str] = None
+    results: Optional[Dict[str, Any]] = None
     error_message: Optional[str] = None
     created_at: datetime
     completed_at: Optional[datetime] = None
@@ -141,4 +142,21 @@ class NPMPackageInfo(BaseModel):
     devDependencies: Dict[str, str] = {}
     downloads: Optional[int] = None
     last_modified: Optional[str] = None
-    maintainers: List[Dict[str, Any]] = []
\ No newline at end of file
+    maintainers: List[Dict[str, Any]] = []
+
+# Security tools schemas
+class PasswordStrengthRequest(BaseModel):
+    password: str = Field(min_length=1)
+
+class HashCheckRequest(BaseModel):
+    hash_value: str = Field(pattern=r"^\s*[0-9a-fA-F]+\s*$")
+    hash_type: str = Field(pattern=r"^(?i:md5|sha1|sha256)$")
+
+class SSLCheckRequest(BaseModel):
+    domain: str = Field(min_length=1)
+
+class EmailSecurityRequest(BaseModel):
+    email: str = Field(pattern=r"^[^@]+@[^@]+$")
+
+class SubdomainTakeoverRequest(BaseModel):
+    subdomain: str = Field(min_length=1)
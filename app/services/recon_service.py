@@ -1,42 +1,83 @@
 import subprocess
 import json
 import asyncio
-import dns.resolver
-import whois
-import requests
-from typing import List, Dict, Any, Optional
+import aiohttp
+import ahocorasick
+from typing import List, Dict, Any, Optional, Tuple
+from collections import OrderedDict
 from urllib.parse import urlparse
 import socket
+import ipaddress
 import re
+import time
+import xml.etree.ElementTree as ET
+from io import BytesIO
+
+# Upper bound on concurrent live-subdomain probes
+LIVE_CHECK_CONCURRENCY = 100
+
+# Upper bound on sockets held open by the fallback port scan
+PORT_SCAN_CONCURRENCY = 500
+# HEAD answers from servers that only implement GET
+HEAD_REJECTED_STATUSES = frozenset({405, 501})
+
+# DNS answers are cached for their TTL, clamped to these bounds (seconds)
+DNS_CACHE_SIZE = 1024
+DNS_CACHE_MIN_TTL = 60
+DNS_CACHE_MAX_TTL = 900
+
+# Page-content signatures, in detection priority order
+CMS_SIGNATURES = {
+    "wp-content": "WordPress",
+    "wordpress": "WordPress",
+    "drupal": "Drupal",
+    "joomla": "Joomla",
+}
+FRAMEWORK_SIGNATURES = {
+    "react": "React",
+    "angular": "Angular",
+    "vue": "Vue.js",
+}
+_TECH_AUTOMATON = ahocorasick.Automaton()
+for _signature, _name in {**CMS_SIGNATURES, **FRAMEWORK_SIGNATURES}.items():
+    _TECH_AUTOMATON.add_word(_signature, _name)
+_TECH_AUTOMATON.make_automaton()
 
 class ReconService:
     """Service for reconnaissance and footprinting operations"""
     
-    def __init__(self):
+    def __init__(self, dns_service: Optional["DNSService"] = None):
         self.timeout = 30
+        self.dns = dns_service or DNSService()
     
     async def enumerate_subdomains(self, domain: str, tools: List[str]) -> Dict[str, Any]:
         """Enumerate subdomains using specified tools"""
-        results = {"subdomains": set(), "live_subdomains": []}
-        
-        for tool in tools:
-            if tool == "subfinder":
-                subdomains = await self._run_subfinder(domain)
-                results["subdomains"].update(subdomains)
-            elif tool == "amass":
-                subdomains = await self._run_amass(domain)
-                results["subdomains"].update(subdomains)
-            elif tool == "sublist3r":
-                subdomains = await self._run_sublist3r(domain)
-                results["subdomains"].update(subdomains)
+        tool_runners = {
+            "subfinder": self._run_subfinder,
+            "amass": self._run_amass,
+            "sublist3r": self._run_sublist3r
+        }
+        runs = [tool_runners[tool](domain) for tool in dict.fromkeys(tools) if tool in tool_runners]
         
-        # Convert set to list
-        results["subdomains"] = list(results["subdomains"])
+        # Tools run concurrently; subdomains each one adds are probed while the rest are still running
+        subdomains = set()
+        live_checks = []
+        for run in asyncio.as_completed(runs):
+            try:
+                found = await run
+            except Exception:
+                continue
+            new_subdomains = [subdomain for subdomain in dict.fromkeys(found) if subdomain not in subdomains]
+            if new_subdomains:
+                subdomains.update(new_subdomains)
+                live_checks.append(asyncio.create_task(self._check_live_subdomains(new_subdomains)))
         
-        # Check which subdomains are live
-        results["live_subdomains"] = await self._check_live_subdomains(results["subdomains"])
+        live_batches = await asyncio.gather(*live_checks)
         
-        return results
+        return {
+            "subdomains": list(subdomains),
+            "live_subdomains": [subdomain for batch in live_batches for subdomain in batch]
+        }
     
     def enumerate_subdomains_sync(self, domain: str, tools: List[str]) -> Dict[str, Any]:
         """Synchronous version for Celery tasks"""
@@ -69,22 +110,30 @@ class ReconService:
     
     async def _check_live_subdomains(self, subdomains: List[str]) -> List[str]:
         """Check which subdomains are live"""
-        live = []
-        for subdomain in subdomains:
-            try:
-                # Simple HTTP check
-                response = requests.get(f"http://{subdomain}", timeout=5)
-                if response.status_code < 400:
-                    live.append(subdomain)
-            except:
+        sem = asyncio.Semaphore(LIVE_CHECK_CONCURRENCY)
+        connector = aiohttp.TCPConnector(limit=100, limit_per_host=3, ttl_dns_cache=300)
+        async with aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=5)) as session:
+            checks = await asyncio.gather(
+                *[self._probe_subdomain(session, sem, subdomain) for subdomain in subdomains],
+                return_exceptions=True
+            )
+        return [subdomain for subdomain, is_live in zip(subdomains, checks) if is_live is True]
+    
+    async def _probe_subdomain(self, session: aiohttp.ClientSession, sem: asyncio.Semaphore, subdomain: str) -> bool:
+        """Probe a subdomain over HTTPS, falling back to HTTP"""
+        async with sem:
+            for scheme in ("https", "http"):
                 try:
-                    # Try HTTPS
-                    response = requests.get(f"https://{subdomain}", timeout=5)
-                    if response.status_code < 400:
-                        live.append(subdomain)
-                except:
-                    pass
-        return live
+                    url = f"{scheme}://{subdomain}"
+                    async with session.head(url, allow_redirects=True) as response:
+                        if response.status not in HEAD_REJECTED_STATUSES:
+                            return response.status < 400
+                    # Server refuses HEAD: only the status line of a GET is needed, never its body
+                    async with session.get(url, allow_redirects=True, read_until_eof=False) as response:
+                        return response.status < 400
+                except (aiohttp.ClientError, asyncio.TimeoutError):
+                    continue
+        return False
     
     async def port_scan(self, target: str, scan_type: str = "fast", ports: Optional[str] = None) -> Dict[str, Any]:
         """Perform port scanning"""
@@ -96,42 +145,59 @@ class ReconService:
             else:
                 port_list = ports or "80,443"
             
-            # Use nmap for port scanning
-            cmd = f"nmap -sS -T4 -p {port_list} {target}"
-            process = await asyncio.create_subprocess_shell(
-                cmd,
+            # Resolve once through the DNS cache so nmap and the fallback scan skip their own lookups
+            address = await self._resolve_target(target)
+            
+            # Use nmap for port scanning; its XML report goes to stdout
+            process = await asyncio.create_subprocess_exec(
+                "nmap", "-sS", "-T4", "-n", "-oX", "-", "-p", port_list, address,
                 stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
+                stderr=asyncio.subprocess.DEVNULL
             )
-            stdout, stderr = await process.communicate()
+            stdout, _ = await process.communicate()
             
             if process.returncode == 0:
-                return self._parse_nmap_output(stdout.decode())
+                return self._parse_nmap_output(stdout)
             else:
                 # Fallback to basic socket scan for common ports
-                return await self._basic_port_scan(target, [80, 443, 22, 21, 25])
+                return await self._basic_port_scan(address, [80, 443, 22, 21, 25])
                 
         except Exception as e:
             return {"error": str(e), "open_ports": [], "services": {}}
     
+    async def _resolve_target(self, target: str) -> str:
+        """IPv4 address for target, or target itself if it cannot be resolved"""
+        try:
+            ipaddress.ip_address(target)
+            return target
+        except ValueError:
+            pass
+        
+        records = await self.dns.lookup(target, "A")
+        if records and not records[0].startswith("Error:"):
+            return records[0]
+        return target
+    
     def port_scan_sync(self, target: str, scan_type: str = "fast") -> Dict[str, Any]:
         """Synchronous version for Celery tasks"""
         return asyncio.run(self.port_scan(target, scan_type))
     
-    def _parse_nmap_output(self, output: str) -> Dict[str, Any]:
-        """Parse nmap output"""
+    def _parse_nmap_output(self, output: bytes) -> Dict[str, Any]:
+        """Parse nmap XML output"""
         open_ports = []
         services = {}
         
-        lines = output.split('\n')
-        for line in lines:
-            if '/tcp' in line and 'open' in line:
-                parts = line.split()
-                if len(parts) >= 2:
-                    port = parts[0].split('/')[0]
-                    service = parts[2] if len(parts) > 2 else "unknown"
-                    open_ports.append(int(port))
-                    services[port] = service
+        # Handle each <port> as soon as it is complete, then drop it
+        for _, elem in ET.iterparse(BytesIO(output)):
+            if elem.tag != "port":
+                continue
+            state = elem.find("state")
+            if elem.get("protocol") == "tcp" and state is not None and state.get("state") == "open":
+                port = elem.get("portid")
+                service = elem.find("service")
+                open_ports.append(int(port))
+                services[port] = service.get("name", "unknown") if service is not None else "unknown"
+            elem.clear()
         
         return {
             "open_ports": open_ports,
@@ -141,27 +207,32 @@ class ReconService:
     
     async def _basic_port_scan(self, target: str, ports: List[int]) -> Dict[str, Any]:
         """Basic port scan using sockets"""
-        open_ports = []
-        services = {}
-        
-        for port in ports:
-            try:
-                sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                sock.settimeout(3)
-                result = sock.connect_ex((target, port))
-                if result == 0:
-                    open_ports.append(port)
-                    services[str(port)] = self._guess_service(port)
-                sock.close()
-            except:
-                pass
+        sem = asyncio.Semaphore(PORT_SCAN_CONCURRENCY)
+        probes = await asyncio.gather(
+            *[self._probe_port(sem, target, port) for port in ports],
+            return_exceptions=True
+        )
+        open_ports = [port for port, is_open in zip(ports, probes) if is_open is True]
         
         return {
             "open_ports": open_ports,
-            "services": services,
+            "services": {str(port): self._guess_service(port) for port in open_ports},
             "total_scanned": len(ports)
         }
     
+    async def _probe_port(self, sem: asyncio.Semaphore, target: str, port: int) -> bool:
+        """Check whether a TCP port accepts connections"""
+        async with sem:
+            try:
+                _, writer = await asyncio.wait_for(
+                    asyncio.open_connection(target, port, family=socket.AF_INET),
+                    timeout=3
+                )
+            except (OSError, asyncio.TimeoutError):
+                return False
+            writer.close()
+            return True
+    
     def _guess_service(self, port: int) -> str:
         """Guess service based on port number"""
         common_ports = {
@@ -180,41 +251,39 @@ class ReconService:
         }
         return common_ports.get(port, "unknown")
     
-    async def detect_tech_stack(self, url: str) -> Dict[str, Any]:
+    async def detect_tech_stack(self, url: str, http: Optional[aiohttp.ClientSession] = None) -> Dict[str, Any]:
         """Detect technology stack of a website"""
+        if http is None:
+            # Celery tasks have no application-wide client; use one for this call only
+            from app.core.http import create_http_session
+            async with create_http_session() as http:
+                return await self.detect_tech_stack(url, http)
+        
         try:
-            response = requests.get(url, timeout=10)
-            headers = response.headers
-            content = response.text.lower()
+            async with http.get(url, timeout=aiohttp.ClientTimeout(total=10)) as response:
+                headers = response.headers
+                # Signatures are ASCII: lowercase the raw bytes and map them 1:1 to str, skipping charset decoding
+                content = (await response.read()).lower().decode("latin-1")
             
             technologies = []
-            cms = None
             web_server = headers.get('Server', 'Unknown')
             programming_languages = []
             frameworks = []
             
+            # Find every content signature in one pass over the page
+            matched = {name for _, name in _TECH_AUTOMATON.iter(content)}
+            
             # Detect CMS
-            if 'wp-content' in content or 'wordpress' in content:
-                cms = "WordPress"
-                technologies.append("WordPress")
-            elif 'drupal' in content:
-                cms = "Drupal"
-                technologies.append("Drupal")
-            elif 'joomla' in content:
-                cms = "Joomla"
-                technologies.append("Joomla")
+            cms = next((name for name in CMS_SIGNATURES.values() if name in matched), None)
+            if cms:
+                technologies.append(cms)
             
             # Detect technologies from headers
             if 'php' in headers.get('X-Powered-By', '').lower():
                 programming_languages.append("PHP")
             
             # Detect from content
-            if 'react' in content:
-                frameworks.append("React")
-            if 'angular' in content:
-                frameworks.append("Angular")
-            if 'vue' in content:
-                frameworks.append("Vue.js")
+            frameworks.extend(name for name in FRAMEWORK_SIGNATURES.values() if name in matched)
             
             return {
                 "technologies": technologies,
@@ -234,19 +303,47 @@ class ReconService:
 class DNSService:
     """Service for DNS operations"""
     
+    def __init__(self, max_entries: int = DNS_CACHE_SIZE):
+        # (domain, record_type) -> (expiry on the monotonic clock, records), least recently used first
+        self._cache: "OrderedDict[Tuple[str, str], Tuple[float, List[str]]]" = OrderedDict()
+        self._max_entries = max_entries
+    
     async def lookup(self, domain: str, record_type: str = "A") -> List[str]:
         """Perform DNS lookup"""
+        key = (domain.lower(), record_type.upper())
+        cached = self._cache.get(key)
+        if cached is not None and time.monotonic() < cached[0]:
+            self._cache.move_to_end(key)
+            return cached[1]
+        
+        # Imported on first use: dnspython is slow to load and most workers never need it
+        import dns.asyncresolver
+        
         try:
-            answers = dns.resolver.resolve(domain, record_type)
-            return [str(answer) for answer in answers]
+            answers = await dns.asyncresolver.resolve(domain, record_type)
+            records = [str(answer) for answer in answers]
         except Exception as e:
             return [f"Error: {str(e)}"]
+        
+        # Honour the record TTL, within sane bounds
+        ttl = max(DNS_CACHE_MIN_TTL, min(answers.rrset.ttl, DNS_CACHE_MAX_TTL))
+        self._cache[key] = (time.monotonic() + ttl, records)
+        self._cache.move_to_end(key)
+        if len(self._cache) > self._max_entries:
+            self._cache.popitem(last=False)
+        return records
+    
+    def flush_cache(self) -> None:
+        """Drop every cached answer"""
+        self._cache.clear()
 
 class WhoisService:
     """Service for WHOIS operations"""
     
     async def lookup(self, domain: str) -> Dict[str, Any]:
         """Perform WHOIS lookup"""
+        import whois
+        
         try:
             w = whois.whois(domain)
             return {
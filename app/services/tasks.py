@@ -1,12 +1,17 @@
 from celery import current_app as celery_app
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 from app.core.database import SessionLocal
 from app.models.models import Scan, ScanStatus
 from app.services.recon_service import ReconService
 from app.services.vulnerability_service import SQLInjectionService
-import json
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator
 from datetime import datetime
 
+# ReconService holds no per-scan state, so one instance serves every task
+_RECON = ReconService()
+
 def get_db():
     db = SessionLocal()
     try:
@@ -14,138 +19,68 @@ def get_db():
     finally:
         db.close()
 
-@celery_app.task
-def subdomain_scan(scan_id: int, domain: str):
-    """Celery task for subdomain enumeration"""
-    db = SessionLocal()
-    try:
-        # Update scan status
-        scan = db.query(Scan).filter(Scan.id == scan_id).first()
-        if not scan:
-            return {"error": "Scan not found"}
-        
-        scan.status = ScanStatus.RUNNING
+def mark_running(scan_id: int) -> None:
+    """Flag a scan as running"""
+    with SessionLocal() as db:
+        result = db.execute(update(Scan).where(Scan.id == scan_id).values(status=ScanStatus.RUNNING.value))
+        if not result.rowcount:
+            raise LookupError(f"Scan {scan_id} not found")
         db.commit()
-        
-        # Perform subdomain enumeration
-        recon_service = ReconService()
-        results = recon_service.enumerate_subdomains_sync(domain, ["subfinder"])
-        
-        # Update scan with results
-        scan.results = json.dumps(results)
-        scan.status = ScanStatus.COMPLETED
-        scan.completed_at = datetime.utcnow()
+
+def finalize(scan_id: int, **values: Any) -> None:
+    """Store a scan's final state"""
+    with SessionLocal() as db:
+        db.execute(update(Scan).where(Scan.id == scan_id).values(**values))
         db.commit()
-        
-        return results
-        
+
+@contextmanager
+def scan_run(scan_id: int) -> Iterator[Dict[str, Any]]:
+    """Run a scan's work, touching the database only before and after it"""
+    mark_running(scan_id)
+    
+    run: Dict[str, Any] = {}
+    try:
+        yield run
     except Exception as e:
-        # Update scan with error
-        scan.status = ScanStatus.FAILED
-        scan.error_message = str(e)
-        db.commit()
-        return {"error": str(e)}
-    finally:
-        db.close()
+        run["results"] = {"error": str(e)}
+        finalize(scan_id, status=ScanStatus.FAILED.value, error_message=str(e))
+    else:
+        try:
+            finalize(
+                scan_id,
+                results=run["results"],
+                status=ScanStatus.COMPLETED.value,
+                completed_at=datetime.utcnow()
+            )
+        except Exception as e:
+            # Results that cannot be stored fail the scan instead of leaving it running
+            run["results"] = {"error": str(e)}
+            finalize(scan_id, status=ScanStatus.FAILED.value, error_message=str(e))
+
+@celery_app.task
+def subdomain_scan(scan_id: int, domain: str):
+    """Celery task for subdomain enumeration"""
+    with scan_run(scan_id) as run:
+        run["results"] = _RECON.enumerate_subdomains_sync(domain, ["subfinder"])
+    return run["results"]
 
 @celery_app.task
 def port_scan(scan_id: int, target: str):
     """Celery task for port scanning"""
-    db = SessionLocal()
-    try:
-        # Update scan status
-        scan = db.query(Scan).filter(Scan.id == scan_id).first()
-        if not scan:
-            return {"error": "Scan not found"}
-        
-        scan.status = ScanStatus.RUNNING
-        db.commit()
-        
-        # Perform port scan
-        recon_service = ReconService()
-        results = recon_service.port_scan_sync(target, "fast")
-        
-        # Update scan with results
-        scan.results = json.dumps(results)
-        scan.status = ScanStatus.COMPLETED
-        scan.completed_at = datetime.utcnow()
-        db.commit()
-        
-        return results
-        
-    except Exception as e:
-        # Update scan with error
-        scan.status = ScanStatus.FAILED
-        scan.error_message = str(e)
-        db.commit()
-        return {"error": str(e)}
-    finally:
-        db.close()
+    with scan_run(scan_id) as run:
+        run["results"] = _RECON.port_scan_sync(target, "fast")
+    return run["results"]
 
 @celery_app.task
 def tech_stack_scan(scan_id: int, url: str):
     """Celery task for technology stack detection"""
-    db = SessionLocal()
-    try:
-        # Update scan status
-        scan = db.query(Scan).filter(Scan.id == scan_id).first()
-        if not scan:
-            return {"error": "Scan not found"}
-        
-        scan.status = ScanStatus.RUNNING
-        db.commit()
-        
-        # Perform tech stack detection
-        recon_service = ReconService()
-        results = recon_service.detect_tech_stack_sync(url)
-        
-        # Update scan with results
-        scan.results = json.dumps(results)
-        scan.status = ScanStatus.COMPLETED
-        scan.completed_at = datetime.utcnow()
-        db.commit()
-        
-        return results
-        
-    except Exception as e:
-        # Update scan with error
-        scan.status = ScanStatus.FAILED
-        scan.error_message = str(e)
-        db.commit()
-        return {"error": str(e)}
-    finally:
-        db.close()
+    with scan_run(scan_id) as run:
+        run["results"] = _RECON.detect_tech_stack_sync(url)
+    return run["results"]
 
 @celery_app.task
 def sql_injection_scan(scan_id: int, url: str):
     """Celery task for SQL injection testing"""
-    db = SessionLocal()
-    try:
-        # Update scan status
-        scan = db.query(Scan).filter(Scan.id == scan_id).first()
-        if not scan:
-            return {"error": "Scan not found"}
-        
-        scan.status = ScanStatus.RUNNING
-        db.commit()
-        
-        # Perform SQL injection scan
-        sql_service = SQLInjectionService()
-        results = sql_service.scan_sync(url)
-        
-        # Update scan with results
-        scan.results = json.dumps(results)
-        scan.status = ScanStatus.COMPLETED
-        scan.completed_at = datetime.utcnow()
-        db.commit()
-        
-        return results
-        
-    except Exception as e:
-        # Update scan with error
-        scan.status = ScanStatus.FAILED
-        scan.error_message = str(e)
-        db.commit()
-        return {"error": str(e)}
-    finally:
-        db.close()
\ No newline at end of file
+    with scan_run(scan_id) as run:
+        run["results"] = SQLInjectionService().scan_sync(url)
+    return run["results"]
@@ -6,6 +6,15 @@ import re
 from typing import List, Dict, Any, Optional
 from urllib.parse import urljoin, urlparse
 import time
+from http.cookiejar import DefaultCookiePolicy
+from requests.adapters import HTTPAdapter
+
+# Keep-alive pool shared by every scanner so repeat probes reuse connections
+_HTTP = requests.Session()
+_HTTP.mount('http://', HTTPAdapter(pool_connections=32, pool_maxsize=64))
+_HTTP.mount('https://', HTTPAdapter(pool_connections=32, pool_maxsize=64))
+# Scans from different users share the pool, so targets' cookies must never be stored
+_HTTP.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
 
 class SQLInjectionService:
     """Service for SQL injection vulnerability testing"""
@@ -45,7 +54,7 @@ class SQLInjectionService:
                 test_url = f"{url}?id={payload}"
                 
                 try:
-                    response = requests.get(test_url, timeout=10)
+                    response = _HTTP.get(test_url, timeout=10)
                     content = response.text.lower()
                     
                     # Check for SQL error indicators
@@ -154,7 +163,7 @@ class XSSService:
                 test_url = f"{url}?search={payload}"
                 
                 try:
-                    response = requests.get(test_url, timeout=10)
+                    response = _HTTP.get(test_url, timeout=10)
                     content = response.text
                     
                     # Check if payload is reflected
@@ -244,7 +253,7 @@ class DirectoryBruteforceService:
                 test_url = urljoin(url, directory + "/")
                 
                 try:
-                    response = requests.head(test_url, timeout=5)
+                    response = _HTTP.head(test_url, timeout=5)
                     total_requests += 1
                     
                     status = response.status_code
@@ -275,7 +284,7 @@ class DirectoryBruteforceService:
                 test_url = urljoin(url, file)
                 
                 try:
-                    response = requests.head(test_url, timeout=5)
+                    response = _HTTP.head(test_url, timeout=5)
                     total_requests += 1
                     
                     status = response.status_code
@@ -337,7 +346,7 @@ class CMSService:
     async def _detect_cms(self, url: str) -> str:
         """Detect CMS type"""
         try:
-            response = requests.get(url, timeout=10)
+            response = _HTTP.get(url, timeout=10)
             content = response.text.lower()
             
             if 'wp-content' in content or 'wordpress' in content:
@@ -427,7 +436,7 @@ class CMSService:
     async def _check_security_headers(self, url: str) -> Dict[str, bool]:
         """Check for security headers"""
         try:
-            response = requests.head(url, timeout=10)
+            response = _HTTP.head(url, timeout=10)
             headers = response.headers
             
             return {
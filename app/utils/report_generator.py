@@ -4,21 +4,44 @@ from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.lib import colors
 from datetime import datetime
-import json
+import orjson
+import jinja2
 from typing import Dict, Any, List
 
+# Style sheet and table styles are built once and shared by every report
+_STYLES = getSampleStyleSheet()
+_TITLE_STYLE = ParagraphStyle(
+    'CustomTitle',
+    parent=_STYLES['Heading1'],
+    fontSize=24,
+    spaceAfter=30,
+    textColor=colors.darkblue
+)
+
+_META_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (0, -1), colors.grey),
+    ('TEXTCOLOR', (0, 0), (0, -1), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 12),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
+    ('BACKGROUND', (1, 0), (1, -1), colors.beige),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black)
+])
+
+_DETAIL_TABLE_STYLE = TableStyle([
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 10),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+])
+
 class ReportGenerator:
     """Generate security audit reports in PDF format"""
     
     def __init__(self):
-        self.styles = getSampleStyleSheet()
-        self.title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=self.styles['Heading1'],
-            fontSize=24,
-            spaceAfter=30,
-            textColor=colors.darkblue
-        )
+        self.styles = _STYLES
+        self.title_style = _TITLE_STYLE
         
     def generate_pdf_report(self, scan_data: Dict[str, Any], output_path: str) -> str:
         """Generate a PDF security audit report"""
@@ -44,16 +67,7 @@ class ReportGenerator:
         ]
         
         meta_table = Table(meta_data, colWidths=[1.5*inch, 4*inch])
-        meta_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (0, -1), colors.grey),
-            ('TEXTCOLOR', (0, 0), (0, -1), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 12),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-            ('BACKGROUND', (1, 0), (1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
+        meta_table.setStyle(_META_TABLE_STYLE)
         
         story.append(meta_table)
         story.append(Spacer(1, 20))
@@ -90,12 +104,7 @@ class ReportGenerator:
         tech_title = Paragraph("Technical Details", self.styles['Heading2'])
         story.append(tech_title)
         
-        results = scan_data.get('results', {})
-        if isinstance(results, str):
-            try:
-                results = json.loads(results)
-            except:
-                results = {"raw_results": results}
+        results = scan_data.get('results') or {}
         
         for key, value in results.items():
             detail = Paragraph(f"<b>{key}:</b> {value}", self.styles['Normal'])
@@ -142,12 +151,7 @@ class ReportGenerator:
         ]
         
         detail_table = Table(details, colWidths=[1.5*inch, 4*inch])
-        detail_table.setStyle(TableStyle([
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-        ]))
+        detail_table.setStyle(_DETAIL_TABLE_STYLE)
         
         elements.append(detail_table)
         
@@ -167,90 +171,82 @@ class ReportGenerator:
         
         return elements
 
+HTML_REPORT_TEMPLATE = """
+<!DOCTYPE html>
+<html>
+<head>
+    <title>Web Security Audit Report</title>
+    <style>
+        body { font-family: Arial, sans-serif; margin: 20px; }
+        .header { background-color: #f4f4f4; padding: 20px; border-radius: 5px; }
+        .vulnerability { border: 1px solid #ddd; margin: 10px 0; padding: 15px; border-radius: 5px; }
+        .high { border-left: 5px solid #ff4444; }
+        .medium { border-left: 5px solid #ffaa00; }
+        .low { border-left: 5px solid #44ff44; }
+        .code { background-color: #f8f8f8; padding: 10px; font-family: monospace; }
+        table { border-collapse: collapse; width: 100%; }
+        th, td { border: 1px solid #ddd; padding: 8px; text-align: left; }
+        th { background-color: #f2f2f2; }
+    </style>
+</head>
+<body>
+    <div class="header">
+        <h1>Web Security Audit Report</h1>
+        <p><strong>Target:</strong> {{ target }}</p>
+        <p><strong>Scan Type:</strong> {{ scan_type }}</p>
+        <p><strong>Date:</strong> {{ date }}</p>
+    </div>
+    
+    <h2>Executive Summary</h2>
+    <p>{{ summary }}</p>
+    
+    <h2>Security Findings</h2>
+    {% for vuln in vulnerabilities %}
+    <div class="vulnerability {{ vuln.get('severity', 'low') | lower }}">
+        <h3>{{ vuln.get('type', 'Unknown Vulnerability') }}</h3>
+        <p><strong>Severity:</strong> {{ vuln.get('severity', 'Unknown') }}</p>
+        <p><strong>URL:</strong> {{ vuln.get('url', 'N/A') }}</p>
+        <p><strong>Description:</strong> {{ vuln.get('description', 'N/A') }}</p>
+        {% if 'payload' in vuln %}<div class="code">{{ vuln['payload'] }}</div>{% endif %}
+    </div>
+    {% endfor %}
+    
+    <h2>Recommendations</h2>
+    <ul>
+        {% for rec in recommendations %}<li>{{ rec }}</li>{% endfor %}
+    </ul>
+    
+    <h2>Technical Details</h2>
+    <div class="code">
+        <pre>{{ technical_details }}</pre>
+    </div>
+</body>
+</html>
+"""
+
+# Compiled once; autoescaping keeps scanned content (payloads, URLs) inert in the report
+_HTML_TEMPLATE = jinja2.Environment(autoescape=True).from_string(HTML_REPORT_TEMPLATE)
+
 class HTMLReportGenerator:
     """Generate security audit reports in HTML format"""
     
     def generate_html_report(self, scan_data: Dict[str, Any], output_path: str) -> str:
         """Generate HTML security audit report"""
         
-        html_template = """
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>Web Security Audit Report</title>
-            <style>
-                body { font-family: Arial, sans-serif; margin: 20px; }
-                .header { background-color: #f4f4f4; padding: 20px; border-radius: 5px; }
-                .vulnerability { border: 1px solid #ddd; margin: 10px 0; padding: 15px; border-radius: 5px; }
-                .high { border-left: 5px solid #ff4444; }
-                .medium { border-left: 5px solid #ffaa00; }
-                .low { border-left: 5px solid #44ff44; }
-                .code { background-color: #f8f8f8; padding: 10px; font-family: monospace; }
-                table { border-collapse: collapse; width: 100%; }
-                th, td { border: 1px solid #ddd; padding: 8px; text-align: left; }
-                th { background-color: #f2f2f2; }
-            </style>
-        </head>
-        <body>
-            <div class="header">
-                <h1>Web Security Audit Report</h1>
-                <p><strong>Target:</strong> {target}</p>
-                <p><strong>Scan Type:</strong> {scan_type}</p>
-                <p><strong>Date:</strong> {date}</p>
-            </div>
-            
-            <h2>Executive Summary</h2>
-            <p>{summary}</p>
-            
-            <h2>Security Findings</h2>
-            {vulnerabilities_html}
-            
-            <h2>Recommendations</h2>
-            <ul>
-                {recommendations_html}
-            </ul>
-            
-            <h2>Technical Details</h2>
-            <div class="code">
-                <pre>{technical_details}</pre>
-            </div>
-        </body>
-        </html>
-        """
-        
-        # Generate vulnerabilities HTML
-        vulnerabilities_html = ""
-        for vuln in scan_data.get('vulnerabilities', []):
-            severity_class = vuln.get('severity', 'low').lower()
-            vuln_html = f"""
-            <div class="vulnerability {severity_class}">
-                <h3>{vuln.get('type', 'Unknown Vulnerability')}</h3>
-                <p><strong>Severity:</strong> {vuln.get('severity', 'Unknown')}</p>
-                <p><strong>URL:</strong> {vuln.get('url', 'N/A')}</p>
-                <p><strong>Description:</strong> {vuln.get('description', 'N/A')}</p>
-                {f'<div class="code">{vuln["payload"]}</div>' if 'payload' in vuln else ''}
-            </div>
-            """
-            vulnerabilities_html += vuln_html
-        
-        # Generate recommendations HTML
-        recommendations_html = ""
-        for rec in scan_data.get('recommendations', []):
-            recommendations_html += f"<li>{rec}</li>"
-        
-        # Fill template
-        html_content = html_template.format(
-            target=scan_data.get('target', 'Unknown'),
-            scan_type=scan_data.get('scan_type', 'Unknown'),
-            date=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            summary=self._generate_summary(scan_data),
-            vulnerabilities_html=vulnerabilities_html,
-            recommendations_html=recommendations_html,
-            technical_details=json.dumps(scan_data.get('results', {}), indent=2)
-        )
-        
+        # Render straight into the file, chunk by chunk
         with open(output_path, 'w') as f:
-            f.write(html_content)
+            _HTML_TEMPLATE.stream(
+                target=scan_data.get('target', 'Unknown'),
+                scan_type=scan_data.get('scan_type', 'Unknown'),
+                date=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                summary=self._generate_summary(scan_data),
+                vulnerabilities=scan_data.get('vulnerabilities', []),
+                recommendations=scan_data.get('recommendations', []),
+                technical_details=orjson.dumps(
+                    scan_data.get('results') or {},
+                    option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+                ).decode()
+            ).dump(f)
         
         return output_path
     
@@ -4,11 +4,14 @@ Comprehensive Test Suite for Web Auditor Application
 Tests all modules and functionality A to Z
 """
 
-import requests
+import aiohttp
+import asyncio
 import json
+import orjson
 import time
 import sys
 import os
+from collections import Counter
 
 # Configuration
 BASE_URL = "http://localhost:8000"
@@ -16,36 +19,75 @@ FRONTEND_URL = "http://localhost:3000"
 
 class WebAuditorTester:
     def __init__(self):
-        self.session = requests.Session()
+        self.session = None
+        self.public_session = None
         self.token = None
         self.user_id = None
-        self.test_results = []
+        # Results are kept column-wise so the summary can count statuses directly
+        self.test_names = []
+        self.test_statuses = []
+        self.test_messages = []
+        self.test_timestamps = []
+        # Result lines are buffered and written out once per phase
+        self.output = []
+        # Timestamps only resolve to the second, so format each second once
+        self.last_timestamp_second = 0
+        self.last_timestamp = ""
+        
+    async def __aenter__(self):
+        # Both sessions share one keep-alive pool; unauthenticated probes never carry the bearer token
+        self.connector = aiohttp.TCPConnector(limit=16, keepalive_timeout=30)
+        self.public_session = aiohttp.ClientSession(connector=self.connector, connector_owner=False)
+        await self.open_session()
+        return self
+        
+    async def __aexit__(self, *exc_info):
+        await self.public_session.close()
+        await self.session.close()
+        await self.connector.close()
+        
+    async def open_session(self):
+        """(Re)open the API session with the current token baked into its default headers"""
+        if self.session:
+            await self.session.close()
+        self.session = aiohttp.ClientSession(
+            connector=self.connector,
+            connector_owner=False,
+            headers={"Authorization": f"Bearer {self.token}"} if self.token else {}
+        )
         
     def log_test(self, test_name, status, message=""):
         """Log test result"""
-        result = {
-            "test": test_name,
-            "status": status,
-            "message": message,
-            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S")
-        }
-        self.test_results.append(result)
+        self.test_names.append(test_name)
+        self.test_statuses.append(status)
+        self.test_messages.append(message)
+        now = int(time.time())
+        if now != self.last_timestamp_second:
+            self.last_timestamp_second = now
+            self.last_timestamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(now))
+        self.test_timestamps.append(self.last_timestamp)
         
         status_symbol = "✅" if status == "PASS" else "❌" if status == "FAIL" else "⚠️"
-        print(f"{status_symbol} {test_name}: {message}")
+        self.output.append(f"{status_symbol} {test_name}: {message}\n")
+        
+    def flush_output(self):
+        """Write buffered result lines to stdout in one call"""
+        sys.stdout.write("".join(self.output))
+        sys.stdout.flush()
+        self.output.clear()
         
-    def test_health_check(self):
+    async def test_health_check(self):
         """Test basic health endpoint"""
         try:
-            response = self.session.get(f"{BASE_URL}/health")
-            if response.status_code == 200 and response.json().get("status") == "healthy":
-                self.log_test("Health Check", "PASS", "Backend is healthy")
-            else:
-                self.log_test("Health Check", "FAIL", f"Health check failed: {response.text}")
+            async with self.public_session.get(f"{BASE_URL}/health") as response:
+                if response.status == 200 and orjson.loads(await response.read()).get("status") == "healthy":
+                    self.log_test("Health Check", "PASS", "Backend is healthy")
+                else:
+                    self.log_test("Health Check", "FAIL", f"Health check failed: {await response.text()}")
         except Exception as e:
             self.log_test("Health Check", "FAIL", f"Connection error: {str(e)}")
             
-    def test_user_registration(self):
+    async def test_user_registration(self):
         """Test user registration"""
         try:
             test_user = {
@@ -54,20 +96,20 @@ class WebAuditorTester:
                 "password": "SecurePassword123!"
             }
             
-            response = self.session.post(f"{BASE_URL}/api/auth/register", json=test_user)
-            if response.status_code == 200:
-                data = response.json()
-                self.user_id = data.get("id")
-                self.log_test("User Registration", "PASS", f"User created with ID: {self.user_id}")
-                return test_user
-            else:
-                self.log_test("User Registration", "FAIL", f"Registration failed: {response.text}")
-                return None
+            async with self.session.post(f"{BASE_URL}/api/auth/register", json=test_user) as response:
+                if response.status == 200:
+                    data = orjson.loads(await response.read())
+                    self.user_id = data.get("id")
+                    self.log_test("User Registration", "PASS", f"User created with ID: {self.user_id}")
+                    return test_user
+                else:
+                    self.log_test("User Registration", "FAIL", f"Registration failed: {await response.text()}")
+                    return None
         except Exception as e:
             self.log_test("User Registration", "FAIL", f"Registration error: {str(e)}")
             return None
             
-    def test_user_login(self, user_data):
+    async def test_user_login(self, user_data):
         """Test user login"""
         if not user_data:
             self.log_test("User Login", "SKIP", "No user data from registration")
@@ -79,58 +121,62 @@ class WebAuditorTester:
                 "password": user_data["password"]
             }
             
-            response = self.session.post(
+            async with self.session.post(
                 f"{BASE_URL}/api/auth/token",
                 data=login_data,
                 headers={"Content-Type": "application/x-www-form-urlencoded"}
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                self.token = data.get("access_token")
-                self.session.headers.update({"Authorization": f"Bearer {self.token}"})
-                self.log_test("User Login", "PASS", "Login successful, token obtained")
-                return True
-            else:
-                self.log_test("User Login", "FAIL", f"Login failed: {response.text}")
-                return False
+            ) as response:
+                if response.status == 200:
+                    data = orjson.loads(await response.read())
+                    self.token = data.get("access_token")
+                    await self.open_session()
+                    self.log_test("User Login", "PASS", "Login successful, token obtained")
+                    return True
+                else:
+                    self.log_test("User Login", "FAIL", f"Login failed: {await response.text()}")
+                    return False
         except Exception as e:
             self.log_test("User Login", "FAIL", f"Login error: {str(e)}")
             return False
             
-    def test_user_profile(self):
+    async def test_authentication(self):
+        """Register a fresh user, then log in as them"""
+        user_data = await self.test_user_registration()
+        return await self.test_user_login(user_data)
+            
+    async def test_user_profile(self):
         """Test user profile retrieval"""
         if not self.token:
             self.log_test("User Profile", "SKIP", "No authentication token")
             return
             
         try:
-            response = self.session.get(f"{BASE_URL}/api/auth/me")
-            if response.status_code == 200:
-                data = response.json()
-                self.log_test("User Profile", "PASS", f"Profile retrieved for user: {data.get('username')}")
-            else:
-                self.log_test("User Profile", "FAIL", f"Profile retrieval failed: {response.text}")
+            async with self.session.get(f"{BASE_URL}/api/auth/me") as response:
+                if response.status == 200:
+                    data = orjson.loads(await response.read())
+                    self.log_test("User Profile", "PASS", f"Profile retrieved for user: {data.get('username')}")
+                else:
+                    self.log_test("User Profile", "FAIL", f"Profile retrieval failed: {await response.text()}")
         except Exception as e:
             self.log_test("User Profile", "FAIL", f"Profile error: {str(e)}")
             
-    def test_npm_package_info(self):
+    async def test_npm_package_info(self):
         """Test NPM package information retrieval"""
         if not self.token:
             self.log_test("NPM Package Info", "SKIP", "No authentication token")
             return
             
         try:
-            response = self.session.get(f"{BASE_URL}/api/npm/package-info/express")
-            if response.status_code == 200:
-                data = response.json()
-                self.log_test("NPM Package Info", "PASS", f"Retrieved info for: {data.get('name')}")
-            else:
-                self.log_test("NPM Package Info", "FAIL", f"Package info failed: {response.text}")
+            async with self.session.get(f"{BASE_URL}/api/npm/package-info/express") as response:
+                if response.status == 200:
+                    data = orjson.loads(await response.read())
+                    self.log_test("NPM Package Info", "PASS", f"Retrieved info for: {data.get('name')}")
+                else:
+                    self.log_test("NPM Package Info", "FAIL", f"Package info failed: {await response.text()}")
         except Exception as e:
             self.log_test("NPM Package Info", "FAIL", f"Package info error: {str(e)}")
             
-    def test_dependency_check(self):
+    async def test_dependency_check(self):
         """Test dependency vulnerability check"""
         if not self.token:
             self.log_test("Dependency Check", "SKIP", "No authentication token")
@@ -141,16 +187,16 @@ class WebAuditorTester:
                 "dependencies": ["express", "lodash", "react"]
             }
             
-            response = self.session.post(f"{BASE_URL}/api/npm/dependency-check", json=test_data)
-            if response.status_code == 200:
-                data = response.json()
-                self.log_test("Dependency Check", "PASS", f"Checked {data.get('checked_packages')} packages")
-            else:
-                self.log_test("Dependency Check", "FAIL", f"Dependency check failed: {response.text}")
+            async with self.session.post(f"{BASE_URL}/api/npm/dependency-check", json=test_data) as response:
+                if response.status == 200:
+                    data = orjson.loads(await response.read())
+                    self.log_test("Dependency Check", "PASS", f"Checked {data.get('checked_packages')} packages")
+                else:
+                    self.log_test("Dependency Check", "FAIL", f"Dependency check failed: {await response.text()}")
         except Exception as e:
             self.log_test("Dependency Check", "FAIL", f"Dependency check error: {str(e)}")
             
-    def test_password_strength(self):
+    async def test_password_strength(self):
         """Test password strength analyzer"""
         if not self.token:
             self.log_test("Password Strength", "SKIP", "No authentication token")
@@ -163,25 +209,32 @@ class WebAuditorTester:
                 "VerySecureComplexPassword2024!"
             ]
             
-            for password in test_passwords:
-                test_data = {"password": password}
-                response = self.session.post(
+            sem = asyncio.Semaphore(8)
+            
+            async def analyze(password):
+                async with sem, self.session.post(
                     f"{BASE_URL}/api/security/password-strength",
-                    json=test_data
-                )
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    strength = data.get('strength')
-                    self.log_test("Password Strength", "PASS", f"Password '{password[:8]}...' rated as {strength}")
+                    json={"password": password}
+                ) as response:
+                    if response.status == 200:
+                        return True, orjson.loads(await response.read()).get('strength')
+                    return False, await response.text()
+            
+            results = await asyncio.gather(*[analyze(p) for p in test_passwords], return_exceptions=True)
+            
+            # Report in list order once every analysis is back
+            for password, result in zip(test_passwords, results):
+                if isinstance(result, Exception):
+                    self.log_test("Password Strength", "FAIL", f"Password strength error: {str(result)}")
+                elif result[0]:
+                    self.log_test("Password Strength", "PASS", f"Password '{password[:8]}...' rated as {result[1]}")
                 else:
-                    self.log_test("Password Strength", "FAIL", f"Password analysis failed: {response.text}")
-                    break
+                    self.log_test("Password Strength", "FAIL", f"Password analysis failed: {result[1]}")
                     
         except Exception as e:
             self.log_test("Password Strength", "FAIL", f"Password strength error: {str(e)}")
             
-    def test_ssl_check(self):
+    async def test_ssl_check(self):
         """Test SSL certificate checking"""
         if not self.token:
             self.log_test("SSL Check", "SKIP", "No authentication token")
@@ -189,17 +242,16 @@ class WebAuditorTester:
             
         try:
             test_data = {"domain": "google.com"}
-            response = self.session.post(f"{BASE_URL}/api/security/ssl-check", json=test_data)
-            
-            if response.status_code == 200:
-                data = response.json()
-                self.log_test("SSL Check", "PASS", f"SSL check for {data.get('domain')} - Score: {data.get('security_score')}")
-            else:
-                self.log_test("SSL Check", "FAIL", f"SSL check failed: {response.text}")
+            async with self.session.post(f"{BASE_URL}/api/security/ssl-check", json=test_data) as response:
+                if response.status == 200:
+                    data = orjson.loads(await response.read())
+                    self.log_test("SSL Check", "PASS", f"SSL check for {data.get('domain')} - Score: {data.get('security_score')}")
+                else:
+                    self.log_test("SSL Check", "FAIL", f"SSL check failed: {await response.text()}")
         except Exception as e:
             self.log_test("SSL Check", "FAIL", f"SSL check error: {str(e)}")
             
-    def test_email_security(self):
+    async def test_email_security(self):
         """Test email security analysis"""
         if not self.token:
             self.log_test("Email Security", "SKIP", "No authentication token")
@@ -207,17 +259,16 @@ class WebAuditorTester:
             
         try:
             test_data = {"email": "test@gmail.com"}
-            response = self.session.post(f"{BASE_URL}/api/security/email-security", json=test_data)
-            
-            if response.status_code == 200:
-                data = response.json()
-                self.log_test("Email Security", "PASS", f"Email security check - Assessment: {data.get('assessment')}")
-            else:
-                self.log_test("Email Security", "FAIL", f"Email security check failed: {response.text}")
+            async with self.session.post(f"{BASE_URL}/api/security/email-security", json=test_data) as response:
+                if response.status == 200:
+                    data = orjson.loads(await response.read())
+                    self.log_test("Email Security", "PASS", f"Email security check - Assessment: {data.get('assessment')}")
+                else:
+                    self.log_test("Email Security", "FAIL", f"Email security check failed: {await response.text()}")
         except Exception as e:
             self.log_test("Email Security", "FAIL", f"Email security error: {str(e)}")
             
-    def test_frontend_accessibility(self):
+    async def test_frontend_accessibility(self):
         """Test frontend page accessibility"""
         try:
             pages = [
@@ -227,75 +278,91 @@ class WebAuditorTester:
                 "/npm-security"
             ]
             
-            for page in pages:
-                response = requests.get(f"{FRONTEND_URL}{page}")
-                if response.status_code == 200:
+            async def fetch_status(page):
+                async with self.public_session.get(f"{FRONTEND_URL}{page}") as response:
+                    return response.status
+            
+            statuses = await asyncio.gather(*[fetch_status(page) for page in pages])
+            
+            for page, status in zip(pages, statuses):
+                if status == 200:
                     self.log_test("Frontend Page", "PASS", f"Page {page} accessible")
                 else:
-                    self.log_test("Frontend Page", "FAIL", f"Page {page} returned {response.status_code}")
+                    self.log_test("Frontend Page", "FAIL", f"Page {page} returned {status}")
                     
         except Exception as e:
             self.log_test("Frontend Page", "FAIL", f"Frontend accessibility error: {str(e)}")
             
-    def test_api_documentation(self):
+    async def test_api_documentation(self):
         """Test API documentation accessibility"""
         try:
-            response = self.session.get(f"{BASE_URL}/docs")
-            if response.status_code == 200:
-                self.log_test("API Documentation", "PASS", "Swagger docs accessible")
-            else:
-                self.log_test("API Documentation", "FAIL", f"API docs returned {response.status_code}")
+            async with self.public_session.get(f"{BASE_URL}/docs") as response:
+                if response.status == 200:
+                    self.log_test("API Documentation", "PASS", "Swagger docs accessible")
+                else:
+                    self.log_test("API Documentation", "FAIL", f"API docs returned {response.status}")
                 
             # Test OpenAPI schema
-            response = self.session.get(f"{BASE_URL}/openapi.json")
-            if response.status_code == 200:
-                data = response.json()
-                self.log_test("OpenAPI Schema", "PASS", f"Schema contains {len(data.get('paths', {}))} endpoints")
-            else:
-                self.log_test("OpenAPI Schema", "FAIL", f"OpenAPI schema returned {response.status_code}")
+            async with self.public_session.get(f"{BASE_URL}/openapi.json") as response:
+                if response.status == 200:
+                    data = orjson.loads(await response.read())
+                    self.log_test("OpenAPI Schema", "PASS", f"Schema contains {len(data.get('paths', {}))} endpoints")
+                else:
+                    self.log_test("OpenAPI Schema", "FAIL", f"OpenAPI schema returned {response.status}")
                 
         except Exception as e:
             self.log_test("API Documentation", "FAIL", f"API documentation error: {str(e)}")
             
-    def run_all_tests(self):
+    async def run_all_tests(self):
         """Run the complete test suite"""
         print("🚀 Starting Web Auditor Comprehensive Test Suite")
         print("=" * 60)
         
-        # Basic connectivity tests
-        self.test_health_check()
-        self.test_api_documentation()
-        self.test_frontend_accessibility()
-        
-        # Authentication tests
-        user_data = self.test_user_registration()
-        login_success = self.test_user_login(user_data)
-        
-        if login_success:
-            self.test_user_profile()
+        # Tests grouped into dependency phases; each phase runs concurrently
+        phases = [
+            # Basic connectivity tests
+            [self.test_health_check, self.test_api_documentation, self.test_frontend_accessibility],
             
-            # NPM Security tests
-            self.test_npm_package_info()
-            self.test_dependency_check()
+            # Authentication tests
+            [self.test_authentication],
             
-            # Security Tools tests
-            self.test_password_strength()
-            self.test_ssl_check()
-            self.test_email_security()
+            # Everything that needs the token: profile, NPM Security and Security Tools tests
+            [
+                self.test_user_profile,
+                self.test_npm_package_info,
+                self.test_dependency_check,
+                self.test_password_strength,
+                self.test_ssl_check,
+                self.test_email_security
+            ]
+        ]
+        
+        for phase in phases:
+            await asyncio.gather(*(test() for test in phase))
+            self.flush_output()
         
         # Print summary
-        self.print_summary()
+        return self.print_summary()
         
     def print_summary(self):
         """Print test summary"""
+        self.flush_output()
         print("\n" + "=" * 60)
         print("📊 TEST SUMMARY")
         print("=" * 60)
         
-        total_tests = len(self.test_results)
-        passed_tests = len([t for t in self.test_results if t["status"] == "PASS"])
-        failed_tests = len([t for t in self.test_results if t["status"] == "FAIL"])
-        skipped_tests = len([t for t in self.test_results if t["status"] == "SKIP"])
+        # One pass: tally statuses and collect failures together
+        counts = Counter()
+        failures = []
+        for name, status, message in zip(self.test_names, self.test_statuses, self.test_messages):
+            counts[status] += 1
+            if status == "FAIL":
+                failures.append((name, message))
+        
+        total_tests = len(self.test_statuses)
+        passed_tests = counts["PASS"]
+        failed_tests = counts["FAIL"]
+        skipped_tests = counts["SKIP"]
         
         print(f"Total Tests: {total_tests}")
         print(f"✅ Passed: {passed_tests}")
@@ -307,14 +374,16 @@ class WebAuditorTester:
         
         if failed_tests > 0:
             print("\n❌ FAILED TESTS:")
-            for test in self.test_results:
-                if test["status"] == "FAIL":
-                    print(f"  - {test['test']}: {test['message']}")
+            for name, message in failures:
+                print(f"  - {name}: {message}")
         
         print("\n🎉 Test suite completed!")
         return failed_tests == 0
 
+async def main():
+    async with WebAuditorTester() as tester:
+        return await tester.run_all_tests()
+
 if __name__ == "__main__":
-    tester = WebAuditorTester()
-    success = tester.run_all_tests()
+    success = asyncio.run(main())
     sys.exit(0 if success else 1)
\ No newline at end of file